@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+import pandas as pd
+
+from config import BASE_PEDIDOS, AGENTE
+
+# --- ALMACÉN DE PEDIDOS (SQLite en modo WAL) ---
+# Los pedidos terminados ya no viven solo en la sesión del navegador: se guardan aquí al
+# momento de terminarlos y sobreviven recargas y reinicios del servidor.
+#   pedidos   -> un registro por pedido (cliente, fecha, agente, lote)
+#   renglones -> un registro por producto del pedido
+# Guardar es solo INSERT (una transacción por pedido); borrar un pedido solo lo marca como
+# anulado. Índices por cliente, fecha y código de producto para el historial.
+# 'lote' agrupa los pedidos de una misma captura (lo que antes era st.session_state.pedidos).
+
+MAX_PEDIDOS_CACHE = 2000
+COLUMNAS_RENGLON = {'CODIGO': 'codigo', 'DESCRIPCION': 'descripcion', 'SOLICITADA': 'solicitada', 'SURTIDO': 'surtido', 'O.C.': 'oc'}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pedidos (
+    id INTEGER PRIMARY KEY,
+    lote TEXT NOT NULL,
+    cli_cod TEXT NOT NULL,
+    cli_nom TEXT,
+    fecha TEXT NOT NULL,
+    agente TEXT,
+    creado TEXT NOT NULL,
+    anulado INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS renglones (
+    pedido_id INTEGER NOT NULL REFERENCES pedidos(id),
+    pos INTEGER NOT NULL,
+    codigo TEXT,
+    descripcion TEXT,
+    solicitada REAL,
+    surtido REAL,
+    oc TEXT,
+    PRIMARY KEY (pedido_id, pos)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_pedidos_lote ON pedidos(lote, anulado);
+CREATE INDEX IF NOT EXISTS ix_pedidos_cliente ON pedidos(cli_cod, fecha);
+CREATE INDEX IF NOT EXISTS ix_pedidos_fecha ON pedidos(fecha);
+CREATE INDEX IF NOT EXISTS ix_renglones_codigo ON renglones(codigo);
+"""
+
+
+def _valor(v):
+    # NaN / NA de pandas -> NULL
+    if v is None: return None
+    try:
+        if pd.isna(v): return None
+    except (TypeError, ValueError): pass
+    return v
+
+
+def _fecha_iso(f):
+    if isinstance(f, datetime): f = f.date()
+    return f.isoformat() if isinstance(f, date) else str(f)
+
+
+class AlmacenPedidos:
+    def __init__(self, ruta=BASE_PEDIDOS):
+        self.ruta = ruta
+        # Una sola conexión compartida por los hilos de Streamlit; las operaciones son cortas
+        self._con = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        # Pedidos ya leídos (id -> dict). Un pedido guardado no cambia, así que nunca se invalida
+        self._cache = OrderedDict()
+        with self._lock:
+            self._con.execute('PRAGMA journal_mode=WAL')
+            self._con.execute('PRAGMA synchronous=NORMAL')
+            self._con.executescript(ESQUEMA)
+
+    def cerrar(self):
+        with self._lock:
+            self._con.close()
+
+    # --- ESCRITURA ---
+    def guardar(self, pedido, lote, agente=AGENTE):
+        # pedido: {'cli_cod', 'cli_nom', 'fecha', 'items': DataFrame o lista de dicts}
+        items = pedido['items']
+        registros = items.to_dict('records') if isinstance(items, pd.DataFrame) else list(items)
+        renglones = [[_valor(r.get(col)) for col in COLUMNAS_RENGLON] for r in registros]
+        with self._lock:
+            self._con.execute('BEGIN')
+            try:
+                cur = self._con.execute(
+                    'INSERT INTO pedidos (lote, cli_cod, cli_nom, fecha, agente, creado) VALUES (?, ?, ?, ?, ?, ?)',
+                    (lote, str(pedido['cli_cod']), pedido['cli_nom'], _fecha_iso(pedido['fecha']), agente, datetime.now().isoformat(timespec='seconds')))
+                pedido_id = cur.lastrowid
+                self._con.executemany(
+                    'INSERT INTO renglones (pedido_id, pos, codigo, descripcion, solicitada, surtido, oc) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [(pedido_id, i, *r) for i, r in enumerate(renglones)])
+                self._con.execute('COMMIT')
+            except Exception:
+                self._con.execute('ROLLBACK')
+                raise
+        return pedido_id
+
+    def anular(self, pedido_id):
+        with self._lock:
+            self._con.execute('UPDATE pedidos SET anulado = 1 WHERE id = ?', (pedido_id,))
+
+    # --- LECTURA ---
+    def _consulta(self, sql, parametros=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._con, params=parametros)
+
+    def ids_de_lote(self, lote):
+        with self._lock:
+            return [r[0] for r in self._con.execute('SELECT id FROM pedidos WHERE lote = ? AND anulado = 0 ORDER BY id', (lote,))]
+
+    def buscar(self, cli_cod=None, desde=None, hasta=None, codigo=None, agente=None, limite=500):
+        # Resumen de pedidos (sin renglones) que cumplen los filtros, más recientes primero
+        condiciones, parametros = ['p.anulado = 0'], []
+        if cli_cod: condiciones.append('p.cli_cod = ?'); parametros.append(str(cli_cod))
+        if desde: condiciones.append('p.fecha >= ?'); parametros.append(_fecha_iso(desde))
+        if hasta: condiciones.append('p.fecha <= ?'); parametros.append(_fecha_iso(hasta))
+        if agente: condiciones.append('p.agente = ?'); parametros.append(agente)
+        if codigo:
+            condiciones.append('p.id IN (SELECT pedido_id FROM renglones WHERE codigo = ?)'); parametros.append(str(codigo))
+        sql = f"""
+            SELECT p.id AS ID, p.fecha AS FECHA, p.cli_cod AS CLIENTE, p.cli_nom AS NOMBRE, p.agente AS AGENTE,
+                   COUNT(r.pos) AS RENGLONES, COALESCE(SUM(r.solicitada), 0) AS PIEZAS
+            FROM pedidos p LEFT JOIN renglones r ON r.pedido_id = p.id
+            WHERE {' AND '.join(condiciones)}
+            GROUP BY p.id ORDER BY p.fecha DESC, p.id DESC LIMIT ?"""
+        return self._consulta(sql, parametros + [int(limite)])
+
+    def cargar(self, ids):
+        # Pedidos completos en el formato que usa exportar_excel ({'cli_cod', ..., 'items'}).
+        # Solo se consultan los que no están en cache; los 'items' son compartidos, no modificarlos.
+        ids = [int(i) for i in ids]
+        with self._lock:
+            faltan = [i for i in ids if i not in self._cache]
+            if faltan: self._leer(faltan)
+            resultado = []
+            for i in ids:
+                if i in self._cache:
+                    self._cache.move_to_end(i)
+                    resultado.append(self._cache[i])
+        return resultado
+
+    def _leer(self, ids):
+        marcas = ','.join('?' * len(ids))
+        cab = self._consulta(f'SELECT id, cli_cod, cli_nom, fecha FROM pedidos WHERE id IN ({marcas})', ids)
+        ren = self._consulta(
+            f'SELECT pedido_id, codigo, descripcion, solicitada, surtido, oc FROM renglones WHERE pedido_id IN ({marcas}) ORDER BY pedido_id, pos', ids)
+        ren.columns = ['pedido_id'] + list(COLUMNAS_RENGLON)
+        # Cantidades enteras cuando lo son (SQLite las devuelve como REAL)
+        for col in ('SOLICITADA', 'SURTIDO'):
+            if ren[col].notna().all() and (ren[col] % 1 == 0).all(): ren[col] = ren[col].astype('int64')
+
+        grupos = dict(iter(ren.groupby('pedido_id', sort=False)))
+        for fila in cab.itertuples(index=False):
+            items = grupos.get(fila.id, ren.iloc[:0]).drop(columns='pedido_id').reset_index(drop=True)
+            self._cache[int(fila.id)] = {'id': int(fila.id), 'cli_cod': fila.cli_cod, 'cli_nom': fila.cli_nom,
+                                         'fecha': date.fromisoformat(fila.fecha), 'items': items}
+        while len(self._cache) > MAX_PEDIDOS_CACHE: self._cache.popitem(last=False)
+
+    def pedidos_de_lote(self, lote):
+        return self.cargar(self.ids_de_lote(lote))
@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# --- BENCHMARK: ARRANQUE EN FRÍO Y LATENCIA POR INTERACCIÓN ---
+# Corre la app con streamlit.testing (sin navegador) en un proceso nuevo por medición.
+# El inventario sale de una carpeta local (CARPETA_INVENTARIO) para no depender de Drive.
+# Uso: python benchmarks/bench_arranque.py [repeticiones]
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MODULOS_PESADOS = ['matplotlib', 'openpyxl', 'PIL', 'gdown']
+ARCHIVOS_APP = ['clientes.csv', 'productos.csv', 'plantilla.xlsx', 'logo.png']
+
+SCRIPT = r'''
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_streamlit = time.perf_counter() - t0
+
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+t = time.perf_counter(); at.run(); frio = time.perf_counter() - t
+# Hasta que el hilo de fondo publique el primer inventario
+t = time.perf_counter(); at.run(); rerun_existencias = time.perf_counter() - t
+t = time.perf_counter(); at.sidebar.radio[0].set_value("📝 Reportar Faltantes").run(); cambio_vista = time.perf_counter() - t
+t = time.perf_counter(); at.run(); rerun_faltantes = time.perf_counter() - t
+
+print(json.dumps({
+    'import_streamlit': t_streamlit,
+    'primera_ejecucion': frio,
+    'rerun_existencias': rerun_existencias,
+    'cambio_vista': cambio_vista,
+    'rerun_faltantes': rerun_faltantes,
+    'excepciones': [str(e.value) for e in at.exception],
+    'modulos': {m: m in sys.modules for m in %r},
+}))
+''' % MODULOS_PESADOS
+
+
+def inventario_de_prueba(carpeta, filas=5000):
+    import pandas as pd
+    df = pd.DataFrame({
+        'CLAVE': [f"X{i:05d}" for i in range(filas)],
+        'DESCRIPCION': [f"PRODUCTO {i}" for i in range(filas)],
+        'LAB': 'L', 'UNIDAD': 'PZA', 'COSTO': 1.0,
+        'CORTA': [i % 3 for i in range(filas)],
+        'EXISTENCIA': [i % 5 for i in range(filas)],
+    })
+    with pd.ExcelWriter(os.path.join(carpeta, 'inventario.xlsx')) as w:
+        df.to_excel(w, index=False, startrow=1)
+
+
+def medir_una_vez(carpeta):
+    # Directorio de trabajo limpio en cada corrida: sin cache en disco ni descargas previas
+    with tempfile.TemporaryDirectory() as trabajo:
+        for archivo in ARCHIVOS_APP: shutil.copy(os.path.join(RAIZ, archivo), trabajo)
+        env = dict(os.environ, CARPETA_INVENTARIO=carpeta, PYTHONPATH=RAIZ)
+        salida = subprocess.run(
+            [sys.executable, '-c', SCRIPT, os.path.join(RAIZ, 'app.py')],
+            cwd=trabajo, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main(repeticiones):
+    with tempfile.TemporaryDirectory() as carpeta:
+        inventario_de_prueba(carpeta)
+        resultados = [medir_una_vez(carpeta) for _ in range(repeticiones)]
+
+    print(f"{'etapa':<20} | {'mejor (s)':>9}")
+    for etapa in ['import_streamlit', 'primera_ejecucion', 'rerun_existencias', 'cambio_vista', 'rerun_faltantes']:
+        print(f"{etapa:<20} | {min(r[etapa] for r in resultados):>9.3f}")
+    print("módulos cargados tras usar ambas vistas:", resultados[-1]['modulos'])
+    if resultados[-1]['excepciones']: print("EXCEPCIONES:", resultados[-1]['excepciones'])
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+from io import BytesIO
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+from config import FILE_PLANTILLA, FILE_IMAGEN
+from exportar_excel import generar_faltantes, generar_zip_por_cliente, COLUMNAS_PEDIDO
+from datos_sinteticos import pedidos_sinteticos
+
+# --- BENCHMARK: GENERACIÓN DE Faltantes.xlsx ---
+# Compara el generador con layout cacheado (xlsxwriter) contra la ruta anterior
+# (openpyxl: load_workbook + copy_worksheet + Image por hoja).
+# Uso: python benchmarks/bench_excel.py [--zip] [pedidos ...]
+#   --zip: un libro por cliente, en serie contra el pool de procesos
+
+
+def generar_openpyxl(pedidos):
+    # Ruta anterior de la vista "Reportar Faltantes"
+    import openpyxl
+    from openpyxl.drawing.image import Image
+    wb = openpyxl.load_workbook(FILE_PLANTILLA)
+    base = wb.active; base.title = "Base"
+    conteo = {}
+    for p in pedidos:
+        cod = p['cli_cod']
+        conteo[cod] = conteo.get(cod, 0) + 1
+        ws = wb.copy_worksheet(base); ws.title = cod if conteo[cod] == 1 else f"{cod}-{conteo[cod]}"
+        ws['B2'] = "SUC. TIJ"; ws['B3'] = "LUIS FELIPE GARCÍA DOMÍNGUEZ"
+        ws['B4'] = p['cli_nom']; ws['D6'] = p['fecha'].strftime('%d/%m/%Y')
+        try: ws['B6'] = int(cod)
+        except: ws['B6'] = cod
+        img = Image(FILE_IMAGEN)
+        img.width = 270; img.height = 80; img.anchor = 'D1'
+        ws.add_image(img)
+        for idx, row in enumerate(p['items'][COLUMNAS_PEDIDO].values.tolist()):
+            for c, val in enumerate(row): ws.cell(row=10 + idx, column=c + 1, value=val)
+    del wb['Base']
+    b = BytesIO(); wb.save(b)
+    return b.getvalue()
+
+
+def medir(funcion, *args):
+    t0 = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - t0, resultado
+
+
+def main(tamanos):
+    generar_faltantes(pedidos_sinteticos(1))  # calienta el cache de plantilla y logo
+    print(f"{'pedidos':>7} | {'openpyxl (s)':>12} | {'MB':>6} | {'nuevo (s)':>9} | {'MB':>6} | {'x':>5}")
+    for n in tamanos:
+        pedidos = pedidos_sinteticos(n)
+        t_viejo, b_viejo = medir(generar_openpyxl, pedidos)
+        t_nuevo, b_nuevo = medir(generar_faltantes, pedidos)
+        print(f"{n:>7} | {t_viejo:>12.3f} | {len(b_viejo) / 1e6:>6.2f} | {t_nuevo:>9.3f} | {len(b_nuevo) / 1e6:>6.2f} | {t_viejo / t_nuevo:>5.1f}")
+
+
+def main_zip(tamanos):
+    procesos = os.cpu_count() or 1
+    print(f"{'pedidos':>7} | {'serie (s)':>9} | {f'{procesos} procesos (s)':>14} | {'MB':>6}")
+    for n in tamanos:
+        pedidos = pedidos_sinteticos(n)
+        t_serie, _ = medir(lambda: generar_zip_por_cliente(pedidos, procesos=1))
+        t_pool, b = medir(lambda: generar_zip_por_cliente(pedidos))
+        print(f"{n:>7} | {t_serie:>9.3f} | {t_pool:>14.3f} | {len(b) / 1e6:>6.2f}")
+
+
+if __name__ == '__main__':
+    argumentos = [a for a in sys.argv[1:] if a != '--zip']
+    tamanos = [int(a) for a in argumentos] or [10, 100, 1000]
+    main_zip(tamanos) if '--zip' in sys.argv else main(tamanos)
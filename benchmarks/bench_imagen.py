@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from inventario import clasificar_existencias, COLORES_IMAGEN, ESTADO_NO_DISPONIBLE, ESTADO_SOLO_CORTA_CAD
+from imagen_revision import renderizar_revision
+
+# --- BENCHMARK: IMAGEN DE LA LISTA DE REVISIÓN ---
+# Compara el renderizador con Pillow contra la ruta anterior (matplotlib ax.table).
+# matplotlib ya no es dependencia de la app: instalarlo aparte solo para este benchmark.
+# Uso: python benchmarks/bench_imagen.py [filas ...]
+
+TITULO = "FARMACIA DE PRUEBA\n20272"
+
+
+def lista_sintetica(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'CODIGO': [f"X{i:05d}" for i in range(n)],
+        'PRODUCTO': [f"PRODUCTO {i} TABLETAS 500MG CAJA C/20" for i in range(n)],
+        'SUSTANCIA': rng.choice(['PARACETAMOL', 'IBUPROFENO', 'ACEITE DE COCO, BREA DE PINO, EQUINACEA, ETC.'], n),
+        'EXISTENCIA': rng.integers(0, 3, n),
+        'CORTA_CAD': rng.integers(0, 3, n),
+        'SOLICITADO': rng.choice(['-', 1, 5, 10], n).astype(str),
+    })
+
+
+def renderizar_matplotlib(df_plot, estado, titulo):
+    # Ruta anterior de app.py (con plt.close, que faltaba)
+    from io import BytesIO
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+
+    fila_color = estado.map(COLORES_IMAGEN).astype(str).to_numpy()
+    cell_colors = np.repeat(fila_color[:, None], len(df_plot.columns), axis=1).tolist()
+    hay_rojo = bool((estado == ESTADO_NO_DISPONIBLE).any())
+    hay_amarillo = bool((estado == ESTADO_SOLO_CORTA_CAD).any())
+
+    alto = len(df_plot) * 0.35 + (0.2 if titulo else 0) + (0.2 if hay_rojo or hay_amarillo else 0)
+    fig, ax = plt.subplots(figsize=(max(10, len(df_plot.columns) * 1.25), alto))
+    ax.axis('off')
+    if titulo: plt.title(titulo, fontsize=16, fontweight='bold', pad=20)
+    tabla = ax.table(cellText=df_plot.values, colLabels=df_plot.columns, cellColours=cell_colors, cellLoc='center', loc='center')
+    tabla.auto_set_font_size(False)
+    tabla.set_fontsize(11)
+    tabla.scale(1, 1.5)
+    tabla.auto_set_column_width(col=list(range(len(df_plot.columns))))
+    leyendas = []
+    if hay_amarillo: leyendas.append(mpatches.Patch(color=COLORES_IMAGEN[ESTADO_SOLO_CORTA_CAD], label=ESTADO_SOLO_CORTA_CAD))
+    if hay_rojo: leyendas.append(mpatches.Patch(color=COLORES_IMAGEN[ESTADO_NO_DISPONIBLE], label=ESTADO_NO_DISPONIBLE))
+    if leyendas: plt.legend(handles=leyendas, loc='upper center', bbox_to_anchor=(0.5, -0.02), ncol=2, frameon=False, fontsize=10)
+    buf = BytesIO()
+    plt.savefig(buf, format='png', bbox_inches='tight', dpi=150, pad_inches=0.5)
+    plt.close(fig)
+    return [buf.getvalue()]
+
+
+def medir(funcion, *args, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos), resultado
+
+
+def main(tamanos):
+    print(f"{'filas':>6} | {'matplotlib (s)':>14} | {'pillow (s)':>10} | {'x':>6} | páginas")
+    for n in tamanos:
+        df = lista_sintetica(n)
+        estado = clasificar_existencias(df)
+        t_mpl, _ = medir(renderizar_matplotlib, df, estado, TITULO, repeticiones=1 if n > 200 else 3)
+        t_pil, paginas = medir(renderizar_revision, df, estado, TITULO)
+        print(f"{n:>6} | {t_mpl:>14.3f} | {t_pil:>10.3f} | {t_mpl / t_pil:>6.1f} | {len(paginas)}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [20, 100, 500])
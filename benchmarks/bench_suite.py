@@ -0,0 +1,139 @@
+import argparse
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+
+from datos_sinteticos import (inventario_sintetico, escribir_inventario, catalogo_productos, catalogo_clientes,
+                              escribir_catalogos, pedidos_sinteticos, lineas_pedido)
+
+# --- SUITE DE BENCHMARKS DEL PIPELINE COMPLETO ---
+# Genera datos sintéticos (inventario con el formato real, catálogos y pedidos) a varios
+# tamaños y mide cada etapa con las funciones de la app. Los resultados se agregan a
+# bench_output.txt (en la raíz del repo) para comparar corridas entre versiones.
+# Uso: python benchmarks/bench_suite.py [--tamanos 1000 10000 100000] [--salida bench_output.txt]
+
+TAMANOS = [1000, 10000, 100000]
+REPETICIONES = 3
+CONSULTAS = ['A000123', 'CLORIXAN', 'TABS 500', 'ORIX', 'PARACETAMOL CAJA', 'ZZZZ']
+PEDIDOS_EXCEL = 100
+RENGLONES_REVISION = 50
+LINEAS_CAPTURA = 200
+
+
+def medir(funcion, repeticiones=REPETICIONES):
+    # Mejor de N (menos ruido); devuelve segundos y el último resultado
+    mejor, resultado = None, None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - t0
+        mejor = t if mejor is None else min(mejor, t)
+    return mejor, resultado
+
+
+def correr_tamano(n, carpeta):
+    from catalogos import cargar_catalogos
+    from indices_catalogo import IndicesCatalogo
+    from inventario import leer_archivo_inventario, procesar_inventario, indexar_inventario, clasificar_existencias, tabla_revision
+    from cache_columnar import CacheColumnar
+    from captura_masiva import resolver
+    from exportar_excel import generar_faltantes
+    from imagen_revision import renderizar_revision
+
+    filas = []
+
+    def anotar(etapa, segundos, elementos):
+        filas.append((n, etapa, segundos, elementos))
+        print(f"{n:>7} | {etapa:<22} | {segundos * 1000:>10.1f} ms | {elementos:>8}", flush=True)
+
+    # Datos (no se mide la generación)
+    inv = inventario_sintetico(n)
+    ruta_xlsx = escribir_inventario(inv, os.path.join(carpeta, f'inventario_{n}.xlsx'))
+    ruta_csv = escribir_inventario(inv, os.path.join(carpeta, f'inventario_{n}.csv'))
+    ruta_cli, ruta_prod = escribir_catalogos(catalogo_productos(inv), catalogo_clientes(max(48, n // 100)), carpeta)
+
+    t, (df_cli, df_prod, errores) = medir(lambda: cargar_catalogos(ruta_cli, ruta_prod))
+    if errores: raise RuntimeError(errores)
+    anotar('cargar_catalogos', t, len(df_prod))
+    t, indices = medir(lambda: IndicesCatalogo(df_cli, df_prod))
+    anotar('indices_catalogo', t, len(df_prod))
+
+    repes = 1 if n >= 100000 else REPETICIONES
+    t, df_raw = medir(lambda: leer_archivo_inventario(ruta_xlsx), repes)
+    anotar('leer_xlsx', t, len(df_raw))
+    t, _ = medir(lambda: leer_archivo_inventario(ruta_csv), repes)
+    anotar('leer_csv', t, len(df_raw))
+    t, (df, indice) = medir(lambda: procesar_inventario(df_raw, df_prod, indices.sustancias), repes)
+    anotar('procesar_inventario', t, len(df))
+    t, _ = medir(lambda: indexar_inventario(df), repes)
+    anotar('  de ello: indexar', t, len(df))
+
+    cache = CacheColumnar(os.path.join(carpeta, 'cache'))
+    t, _ = medir(lambda: cache.guardar(f'bench{n}', df, indice), 1)
+    anotar('cache_guardar', t, len(df))
+    t, _ = medir(lambda: cache.leer(f'bench{n}'))
+    anotar('cache_leer', t, len(df))
+
+    tiempos = []
+    for consulta in CONSULTAS:
+        t, _ = medir(lambda: indice.buscar(consulta, limite=50))
+        tiempos.append(t)
+    anotar('buscar (mediana)', float(np.median(tiempos)), len(CONSULTAS))
+    anotar('buscar (peor)', max(tiempos), len(CONSULTAS))
+
+    t, _ = medir(lambda: clasificar_existencias(df))
+    anotar('clasificar_existencias', t, len(df))
+
+    codigos_cat = df_prod['CODIGO'].to_numpy()
+    lineas = lineas_pedido(LINEAS_CAPTURA, codigos_cat, df_cli['CODIGO'].astype(str).to_numpy())
+    t, _ = medir(lambda: resolver(lineas, indices))
+    anotar('captura_masiva', t, LINEAS_CAPTURA)
+
+    rev = tabla_revision(df.iloc[:RENGLONES_REVISION].drop(columns=['INDICE_BUSQUEDA']).assign(SOLICITADO='-'))
+    estado = clasificar_existencias(rev)
+    t, _ = medir(lambda: renderizar_revision(rev, estado, "FARMACIA DE PRUEBA\n20272"))
+    anotar('imagen_revision', t, RENGLONES_REVISION)
+
+    pedidos = pedidos_sinteticos(PEDIDOS_EXCEL, codigos_catalogo=codigos_cat)
+    generar_faltantes(pedidos[:1])  # calienta el cache de plantilla y logo
+    t, _ = medir(lambda: generar_faltantes(pedidos), 1)
+    anotar('exportar_excel', t, PEDIDOS_EXCEL)
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS)
+    parser.add_argument('--salida', default=os.path.join(RAIZ, 'bench_output.txt'))
+    args = parser.parse_args(argv)
+
+    os.chdir(RAIZ)  # plantilla.xlsx y logo.png se buscan relativos a la raíz
+    from ingesta import HAY_CALAMINE
+    encabezado = (f"# {datetime.now().isoformat(timespec='seconds')} | python {platform.python_version()} | "
+                  f"pandas {pd.__version__} | calamine={'sí' if HAY_CALAMINE else 'no'} | {platform.machine()} x{os.cpu_count()}")
+    print(encabezado)
+    print(f"{'filas':>7} | {'etapa':<22} | {'tiempo':>13} | {'elementos':>8}")
+
+    filas = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for n in args.tamanos:
+            filas += correr_tamano(n, carpeta)
+
+    with open(args.salida, 'a', encoding='utf-8') as f:
+        f.write(encabezado + '\n')
+        for n, etapa, segundos, elementos in filas:
+            f.write(f"{n}\t{etapa.strip()}\t{segundos * 1000:.2f}\t{elementos}\n")
+    print(f"Resultados agregados a {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
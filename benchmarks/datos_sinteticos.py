@@ -0,0 +1,115 @@
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# --- GENERADORES DE DATOS SINTÉTICOS PARA LOS BENCHMARKS ---
+# Inventario con el formato real del archivo diario (encabezado en la fila 2; código,
+# producto, corta caducidad y existencia en las columnas 0/1/5/6), catálogos de clientes y
+# productos que coinciden con él, y lotes de pedidos. Misma semilla = mismos datos.
+
+SUSTANCIAS = ['PARACETAMOL', 'IBUPROFENO', 'ACICLOVIR', 'AMOXICILINA', 'OMEPRAZOL', 'LORATADINA',
+              'METFORMINA', 'LOSARTAN', 'ACEITE DE COCO, BREA DE PINO, EQUINACEA, ETC.']
+PRESENTACIONES = ['500 MG CAJA C/20 TABS', '200 MG FRASCO C/50 TABS', '10 MG CAJA C/10 CAPS', 'SUSP. 120 ML', 'GEL 30 G']
+MARCAS = ['CLORIXAN', 'DOLOFIN', 'GASTROL', 'ALERGIN', 'DIABEX', 'PRESSIL', 'MOTA', 'FEBRAX']
+
+
+def codigos(n):
+    letras = np.array(list('SVXAB'))
+    return [f"{letras[i % len(letras)]}{i:06d}" for i in range(n)]
+
+
+def inventario_sintetico(n, semilla=0):
+    # Las 7 primeras columnas del archivo real; algunas existencias vienen como texto ('N/D')
+    # y algunos renglones sin código (subtotales), como en los archivos de la sucursal.
+    rng = np.random.default_rng(semilla)
+    cods = codigos(n)
+    marca = rng.integers(0, len(MARCAS), n)
+    pres = rng.integers(0, len(PRESENTACIONES), n)
+    productos = [f"{MARCAS[m]} {PRESENTACIONES[p]}" for m, p in zip(marca, pres)]
+    existencia = rng.integers(0, 40, n).astype(object)
+    existencia[rng.random(n) < 0.3] = 0
+    existencia[rng.random(n) < 0.01] = 'N/D'
+    corta = np.where(rng.random(n) < 0.2, rng.integers(1, 10, n), 0)
+    df = pd.DataFrame({
+        'CLAVE': cods,
+        'DESCRIPCION': productos,
+        'LABORATORIO': rng.choice(['LAB A', 'LAB B', 'LAB C'], n),
+        'UNIDAD': 'PZA',
+        'COSTO': rng.integers(10, 900, n) / 10,
+        'CORTA CAD.': corta,
+        'EXISTENCIA': existencia,
+    })
+    df.loc[rng.random(n) < 0.005, 'CLAVE'] = None
+    return df
+
+
+def escribir_inventario(df, ruta):
+    # Título en la fila 1 y encabezados en la fila 2 (header=1 al leer)
+    if ruta.endswith('.csv'):
+        with open(ruta, 'w', encoding='latin-1', newline='') as f:
+            f.write('INVENTARIO SUC. TIJ\n')
+            df.to_csv(f, index=False)
+        return ruta
+    with pd.ExcelWriter(ruta, engine='xlsxwriter') as w:
+        df.to_excel(w, index=False, startrow=1)
+        w.sheets['Sheet1'].write(0, 0, 'INVENTARIO SUC. TIJ')
+    return ruta
+
+
+def catalogo_productos(df_inventario, cobertura=0.8, semilla=0):
+    # productos.csv con los encabezados reales; solo una parte de los códigos del inventario
+    rng = np.random.default_rng(semilla)
+    df = df_inventario.dropna(subset=['CLAVE'])
+    df = df[rng.random(len(df)) < cobertura]
+    return pd.DataFrame({
+        'CLAVE': df['CLAVE'].to_numpy(),
+        'NOMBRE': df['DESCRIPCION'].to_numpy(),
+        'SUSTANCIA ACTIVA': rng.choice(SUSTANCIAS, len(df)),
+    })
+
+
+def catalogo_clientes(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'CLIENTE CLAVE': 20000 + np.arange(n),
+        'CLIENTE': [f"FARMACIA {nombre} {i}" for i, nombre in enumerate(rng.choice(['SANTA MARIA', 'MAYOF', 'SUPREMA', 'DEL PUEBLO'], n))],
+    })
+
+
+def escribir_catalogos(df_productos, df_clientes, carpeta):
+    rutas = os.path.join(carpeta, 'clientes.csv'), os.path.join(carpeta, 'productos.csv')
+    df_clientes.to_csv(rutas[0], index=False, encoding='utf-8')
+    df_productos.to_csv(rutas[1], index=False, encoding='utf-8')
+    return rutas
+
+
+def pedidos_sinteticos(n, renglones=20, clientes=48, codigos_catalogo=None, semilla=0):
+    # Pedidos con el formato de la app ({'cli_cod', 'cli_nom', 'fecha', 'items'})
+    rng = np.random.default_rng(semilla)
+    pedidos = []
+    for i in range(n):
+        if codigos_catalogo is not None:
+            cods = list(rng.choice(codigos_catalogo, renglones))
+            descs = [f"PRODUCTO {c}" for c in cods]
+        else:
+            cods = [f"X{j:05d}" for j in rng.integers(0, 99999, renglones)]
+            descs = [f"PRODUCTO {j} TABLETAS 500MG" for j in rng.integers(0, 99999, renglones)]
+        items = pd.DataFrame({
+            'CODIGO': cods,
+            'DESCRIPCION': descs,
+            'SOLICITADA': rng.integers(1, 20, renglones),
+            'SURTIDO': 0,
+            'O.C.': 'N/A',
+        })
+        pedidos.append({'cli_cod': str(20000 + i % clientes), 'cli_nom': f"FARMACIA {i % clientes}", 'fecha': date(2026, 1, 1), 'items': items})
+    return pedidos
+
+
+def lineas_pedido(n, codigos_catalogo, clientes=None, semilla=0):
+    # Renglones "código, cantidad[, cliente]" como los de la captura masiva
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({'CODIGO': rng.choice(codigos_catalogo, n), 'CANTIDAD': rng.integers(1, 20, n).astype(str)}, dtype=object)
+    df['CLIENTE'] = [str(c) for c in rng.choice(clientes, n)] if clientes is not None else None
+    return df
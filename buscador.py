@@ -0,0 +1,160 @@
+import heapq
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+
+# --- MOTOR DE BÚSQUEDA COMPARTIDO (INVENTARIO Y CATÁLOGO) ---
+# Cada fila se normaliza una sola vez (mayúsculas y sin acentos: "JABÓN" -> "JABON")
+# y se descompone en trigramas ("PARACETAMOL" -> "PAR", "ARA", "RAC", ...).
+# Buscar un término es intersectar las listas de filas de sus trigramas y
+# luego confirmar con una comparación literal (sin regex) solo sobre esos candidatos.
+
+TAM_NGRAMA = 3
+LIMITE_RESULTADOS = 200
+# derivar(): si cambió más de esta fracción de filas conviene construir el índice desde cero
+FRACCION_MAX_CAMBIOS = 0.5
+
+# Rangos de relevancia (menor = mejor)
+RANGO_CODIGO_EXACTO = 0
+RANGO_PREFIJO = 1
+RANGO_SUBCADENA = 2
+
+ResultadoBusqueda = namedtuple('ResultadoBusqueda', ['posiciones', 'total'])
+
+
+def normalizar(texto):
+    texto = str(texto)
+    if not texto.isascii():
+        texto = ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+    return texto.upper()
+
+
+def _ngramas(texto, n=TAM_NGRAMA):
+    return {texto[i:i + n] for i in range(len(texto) - n + 1)}
+
+
+def _postings(textos, filas):
+    # trigrama -> filas (en orden) que lo contienen, solo para las 'filas' indicadas
+    postings = {}
+    for fila in filas:
+        for g in _ngramas(textos[fila]):
+            postings.setdefault(g, []).append(fila)
+    return postings
+
+
+class IndiceBusqueda:
+    def __init__(self, textos, codigos=None):
+        # Un texto por fila del DataFrame; 'codigos' habilita el rango de código exacto
+        self.textos = [normalizar(t) for t in textos]
+        # Con espacio al inicio para detectar inicios de palabra con un simple 'in'
+        self._palabras = [' ' + t.replace('|', ' ') for t in self.textos]
+        self.codigos = [normalizar(c).strip() for c in codigos] if codigos is not None else None
+
+        # Arreglos ordenados de int32: ocupan poco y se intersectan rápido
+        self.postings = {g: np.array(filas, dtype=np.int32) for g, filas in _postings(self.textos, range(len(self.textos))).items()}
+
+    def derivar(self, textos, codigos):
+        # Índice para una versión nueva de las mismas filas (p. ej. el inventario del día siguiente).
+        # Las filas con el mismo código y el mismo texto reutilizan sus trigramas (la existencia no
+        # entra en el texto, así que un cambio de stock no reindexa nada); solo las filas nuevas o
+        # cambiadas se descomponen. Devuelve (índice nuevo, filas reutilizadas); 'self' no cambia.
+        textos = [normalizar(t) for t in textos]
+        codigos = [normalizar(c).strip() for c in codigos]
+        if self.codigos is None: return IndiceBusqueda(textos, codigos), 0
+
+        posicion_previa = {}
+        for fila, codigo in enumerate(self.codigos):
+            posicion_previa.setdefault(codigo, fila)
+
+        # Reutilizables: mismo código y texto, y en el mismo orden relativo que antes (así las
+        # listas de filas siguen ordenadas después de renumerarlas)
+        nuevas, viejas, ultima = [], [], -1
+        for fila, (codigo, texto) in enumerate(zip(codigos, textos)):
+            previa = posicion_previa.get(codigo)
+            if previa is not None and previa > ultima and self.textos[previa] == texto:
+                nuevas.append(fila)
+                viejas.append(previa)
+                ultima = previa
+        if len(textos) - len(nuevas) > FRACCION_MAX_CAMBIOS * len(textos): return IndiceBusqueda(textos, codigos), 0
+
+        indice = IndiceBusqueda.__new__(IndiceBusqueda)
+        indice.textos = textos
+        indice.codigos = codigos
+        palabras_previas = self._palabras
+        indice._palabras = [None] * len(textos)
+        for fila, previa in zip(nuevas, viejas):
+            indice._palabras[fila] = palabras_previas[previa]
+
+        # Vieja posición -> nueva (-1 = la fila ya no está o cambió)
+        renumerar = np.full(len(self.textos), -1, dtype=np.int32)
+        renumerar[viejas] = nuevas
+        postings = {}
+        for g, filas in self.postings.items():
+            filas = renumerar[filas]
+            filas = filas[filas >= 0]
+            if len(filas): postings[g] = filas
+
+        reutilizada = np.zeros(len(textos), dtype=bool)
+        reutilizada[nuevas] = True
+        cambiadas = np.flatnonzero(~reutilizada)
+        for fila in cambiadas:
+            indice._palabras[fila] = ' ' + textos[fila].replace('|', ' ')
+        for g, filas in _postings(textos, cambiadas).items():
+            previas = postings.get(g)
+            filas = np.array(filas, dtype=np.int32)
+            postings[g] = filas if previas is None else np.sort(np.concatenate([previas, filas]))
+        indice.postings = postings
+        return indice, len(nuevas)
+
+    def __len__(self):
+        return len(self.textos)
+
+    def _candidatos(self, terminos):
+        listas = []
+        for t in terminos:
+            if len(t) < TAM_NGRAMA: continue
+            for g in _ngramas(t):
+                filas = self.postings.get(g)
+                if filas is None: return np.array([], dtype=np.int32)
+                listas.append(filas)
+
+        # Sin términos indexables (1-2 letras): se revisan todas las filas
+        if not listas: return None
+
+        listas.sort(key=len)
+        candidatos = listas[0]
+        for filas in listas[1:]:
+            candidatos = np.intersect1d(candidatos, filas, assume_unique=True)
+            if len(candidatos) == 0: break
+        return candidatos
+
+    def _rango(self, fila, consulta, terminos):
+        if self.codigos is not None:
+            codigo = self.codigos[fila]
+            if codigo == consulta: return RANGO_CODIGO_EXACTO
+            if codigo.startswith(consulta): return RANGO_PREFIJO
+        palabras = self._palabras[fila]
+        if all(' ' + t in palabras for t in terminos): return RANGO_PREFIJO
+        return RANGO_SUBCADENA
+
+    def buscar(self, consulta, limite=LIMITE_RESULTADOS):
+        # Filas que contienen TODAS las palabras, en cualquier orden ("500 PARACETAMOL"
+        # == "PARACETAMOL 500"), ordenadas por relevancia y recortadas a 'limite'.
+        consulta = normalizar(consulta).strip()
+        terminos = consulta.split()
+        if not terminos: return ResultadoBusqueda(np.array([], dtype=np.int64), 0)
+
+        candidatos = self._candidatos(terminos)
+        if candidatos is None: candidatos = range(len(self.textos))
+
+        textos = self.textos
+        encontrados = [i for i in candidatos if all(t in textos[i] for t in terminos)]
+
+        # Orden estable: a igual rango se respeta el orden original del archivo.
+        # Si solo se pide una página, se eligen los mejores sin ordenar todos los encontrados.
+        total = len(encontrados)
+        rango = lambda i: self._rango(i, consulta, terminos)
+        if limite is not None and total > limite: encontrados = heapq.nsmallest(limite, encontrados, key=rango)
+        else: encontrados.sort(key=rango)
+        return ResultadoBusqueda(np.array(encontrados, dtype=np.int64), total)
@@ -0,0 +1,98 @@
+import glob
+import os
+import pickle
+
+import pandas as pd
+
+# --- CACHE EN DISCO DE INVENTARIOS YA PROCESADOS ---
+# Llave = hash del archivo original (+ huella del catálogo). Cada entrada son hasta tres archivos:
+#   <llave>.parquet  -> DataFrame procesado (columnar, se lee en milisegundos)
+#   <llave>.indice   -> IndiceBusqueda serializado (evita reconstruir los trigramas)
+#   <llave>.reporte  -> ReporteIngesta de la lectura original (el panel de validación lo muestra
+#                       también cuando el inventario sale del cache)
+# Sobrevive reinicios del servidor; se borran las entradas menos usadas al pasar 'tamano_maximo'.
+
+DIRECTORIO_CACHE = './cache_inventarios'
+TAMANO_MAXIMO = 500 * 1024 * 1024  # bytes
+
+
+class CacheColumnar:
+    def __init__(self, directorio=DIRECTORIO_CACHE, tamano_maximo=TAMANO_MAXIMO):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+        os.makedirs(directorio, exist_ok=True)
+
+    def _rutas(self, llave):
+        base = os.path.join(self.directorio, llave)
+        return base + '.parquet', base + '.indice', base + '.reporte'
+
+    def leer(self, llave):
+        # (df, indice, reporte) o None; el reporte es None si la entrada se guardó sin él
+        ruta_df, ruta_indice, ruta_reporte = self._rutas(llave)
+        if not (os.path.exists(ruta_df) and os.path.exists(ruta_indice)): return None
+        try:
+            df = pd.read_parquet(ruta_df)
+            with open(ruta_indice, 'rb') as f:
+                indice = pickle.load(f)
+            reporte = None
+            if os.path.exists(ruta_reporte):
+                with open(ruta_reporte, 'rb') as f:
+                    reporte = pickle.load(f)
+        except Exception:
+            # Entrada corrupta o de otra versión: se descarta y se vuelve a procesar
+            self.borrar(llave)
+            return None
+
+        # "Tocar" los archivos para que la limpieza los trate como usados recientemente
+        for ruta in (ruta_df, ruta_indice, ruta_reporte):
+            try: os.utime(ruta)
+            except OSError: pass
+        return df, indice, reporte
+
+    def guardar(self, llave, df, indice, reporte=None):
+        rutas = self._rutas(llave)
+        ruta_df, ruta_indice, ruta_reporte = rutas
+        try:
+            # Escritura atómica: primero a .tmp y luego os.replace. El reporte va antes que el
+            # parquet: una entrada legible nunca queda con el reporte de otra lectura.
+            if reporte is not None:
+                with open(ruta_reporte + '.tmp', 'wb') as f:
+                    pickle.dump(reporte, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(ruta_reporte + '.tmp', ruta_reporte)
+            elif os.path.exists(ruta_reporte):
+                os.remove(ruta_reporte)
+            df.to_parquet(ruta_df + '.tmp', index=False)
+            with open(ruta_indice + '.tmp', 'wb') as f:
+                pickle.dump(indice, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(ruta_df + '.tmp', ruta_df)
+            os.replace(ruta_indice + '.tmp', ruta_indice)
+        except Exception:
+            # El cache es opcional: si no se puede escribir (disco lleno, tipos mixtos) se sigue sin él
+            for ruta in [r + '.tmp' for r in rutas] + list(rutas):
+                try: os.remove(ruta)
+                except OSError: pass
+            return False
+        self.limpiar()
+        return True
+
+    def borrar(self, llave):
+        for ruta in self._rutas(llave):
+            try: os.remove(ruta)
+            except OSError: pass
+
+    def limpiar(self):
+        # Agrupa por llave y borra las menos usadas hasta quedar bajo el límite
+        entradas = {}
+        for ruta in (glob.glob(os.path.join(self.directorio, '*.parquet')) + glob.glob(os.path.join(self.directorio, '*.indice'))
+                     + glob.glob(os.path.join(self.directorio, '*.reporte'))):
+            try: stat = os.stat(ruta)
+            except OSError: continue
+            llave = os.path.splitext(os.path.basename(ruta))[0]
+            tamano, mtime = entradas.get(llave, (0, 0))
+            entradas[llave] = (tamano + stat.st_size, max(mtime, stat.st_mtime))
+
+        total = sum(t for t, _ in entradas.values())
+        for llave, (tamano, _) in sorted(entradas.items(), key=lambda e: e[1][1]):
+            if total <= self.tamano_maximo: break
+            self.borrar(llave)
+            total -= tamano
@@ -0,0 +1,97 @@
+import re
+from collections import namedtuple
+
+import pandas as pd
+
+import ingesta
+from ingesta import Columna, Esquema, TIPO_CODIGO
+
+# --- CAPTURA MASIVA DE FALTANTES ---
+# Convierte una lista pegada (chat, Excel) o un archivo CSV/xlsx con renglones
+# "código, cantidad[, cliente]" en renglones de carrito. Todos los códigos se resuelven
+# contra el catálogo con un solo map vectorizado; los desconocidos se reportan aparte.
+
+COLUMNAS_LISTA = ['CODIGO', 'CANTIDAD', 'CLIENTE']
+# fila_defecto=None: una lista sin encabezados empieza con datos desde el primer renglón
+ESQUEMA_LISTA = Esquema('lista', [
+    Columna('CODIGO', ('CLAVE', 'CODIGO'), 0, TIPO_CODIGO),
+    Columna('CANTIDAD', ('CANT', 'PIEZAS', 'SOLICIT'), 1),
+    Columna('CLIENTE', ('CLIENTE',), 2, requerida=False),
+    Columna('FECHA', ('FECHA',), None, requerida=False),
+], fila_defecto=None)
+SEPARADORES = re.compile(r'[\t,;|]')
+
+ResultadoCaptura = namedtuple('ResultadoCaptura', ['renglones', 'desconocidos', 'clientes_desconocidos', 'invalidos'])
+
+
+def leer_texto(texto):
+    # Un renglón por línea; separado por tabulador, coma, punto y coma, '|' o espacios
+    filas = []
+    for linea in texto.splitlines():
+        linea = linea.strip()
+        if not linea: continue
+        campos = [c.strip() for c in SEPARADORES.split(linea)] if SEPARADORES.search(linea) else linea.split()
+        filas.append((campos + [None, None])[:3])
+    return pd.DataFrame(filas, columns=COLUMNAS_LISTA, dtype=object)
+
+
+def leer_archivo(contenido, nombre):
+    # CSV o Excel por ingesta.leer: las columnas se ubican por nombre (CLAVE/CODIGO, CANT/PIEZAS,
+    # CLIENTE, FECHA opcional) y si no hay encabezados reconocibles se toman las tres primeras en orden
+    try:
+        lectura = ingesta.leer(contenido, ESQUEMA_LISTA, nombre, dtype=str)
+    except ValueError:
+        # Un CSV que no se parte en columnas (código y cantidad separados por espacios): como texto pegado
+        if not nombre.lower().endswith('.csv'): raise
+        return leer_texto(contenido.decode(ingesta.detectar_codificacion(contenido)))
+    df = lectura.df.dropna(subset=['CODIGO'])
+    return df if 'FECHA' in lectura.reporte.columnas else df.drop(columns='FECHA')
+
+
+def fecha_de_texto(texto, defecto):
+    # Columna FECHA de una lista ('2026-10-01', '01/10/2026'); vacía o ilegible -> 'defecto'
+    if texto is None or (isinstance(texto, float) and pd.isna(texto)) or str(texto).strip() == '': return defecto
+    f = pd.to_datetime(str(texto), errors='coerce', dayfirst='/' in str(texto))
+    return defecto if pd.isna(f) else f.date()
+
+
+def resolver(lineas, indices):
+    # lineas: DataFrame CODIGO / CANTIDAD / CLIENTE (texto) y FECHA opcional. Devuelve renglones
+    # listos para el carrito (con DESCRIPCION y cliente resuelto) y lo que no se pudo usar.
+    df = lineas.copy()
+    # Los códigos se comparan igual que en el catálogo (solo sin espacios, ver indices_catalogo._mapa);
+    # uno capturado en minúsculas que no aparece así se busca otra vez en mayúsculas
+    df['CODIGO'] = df['CODIGO'].astype(str).str.strip()
+    df['DESCRIPCION'] = df['CODIGO'].map(indices.descripciones)
+    faltan = df['DESCRIPCION'].isna()
+    if faltan.any():
+        mayusculas = df.loc[faltan, 'CODIGO'].str.upper()
+        encontrados = mayusculas.map(indices.descripciones)
+        df.loc[faltan, 'CODIGO'] = mayusculas.where(encontrados.notna(), df.loc[faltan, 'CODIGO'])
+        df.loc[faltan, 'DESCRIPCION'] = encontrados
+    df['SOLICITADA'] = pd.to_numeric(df['CANTIDAD'].astype(str).str.strip().str.replace(',', '', regex=False), errors='coerce')
+    cliente = df['CLIENTE'].where(df['CLIENTE'].notna(), '').astype(str).str.strip()
+    df['CLIENTE'] = cliente.map(indices.cliente_por_codigo)
+
+    desconocido = df['DESCRIPCION'].isna()
+    cliente_malo = (cliente != '') & df['CLIENTE'].isna()
+    # Piezas enteras y positivas: 0.4 no se convierte en un renglón de 0 piezas
+    invalido = ~desconocido & ~cliente_malo & ~((df['SOLICITADA'] > 0) & (df['SOLICITADA'] % 1 == 0))
+
+    ok = df[~(desconocido | cliente_malo | invalido)].copy()
+    ok['SOLICITADA'] = ok['SOLICITADA'].astype('int64')
+    ok['CLIENTE'] = ok['CLIENTE'].where(ok['CLIENTE'].notna(), None)
+    # Un código repetido para el mismo cliente (y fecha) se suma en un solo renglón (en el orden de la lista)
+    claves = ['CLIENTE', 'FECHA', 'CODIGO'] if 'FECHA' in ok else ['CLIENTE', 'CODIGO']
+    ok = (ok.groupby(claves, sort=False, dropna=False)
+            .agg(DESCRIPCION=('DESCRIPCION', 'first'), SOLICITADA=('SOLICITADA', 'sum'))
+            .reset_index())
+    ok['SURTIDO'] = 0
+    ok['O.C.'] = 'N/A'
+
+    return ResultadoCaptura(
+        renglones=ok,
+        desconocidos=df.loc[desconocido, 'CODIGO'].drop_duplicates().tolist(),
+        clientes_desconocidos=cliente[cliente_malo].drop_duplicates().tolist(),
+        invalidos=df.loc[invalido, 'CODIGO'].tolist(),
+    )
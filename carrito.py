@@ -0,0 +1,69 @@
+import pandas as pd
+
+from exportar_excel import COLUMNAS_PEDIDO
+
+# --- CARRITO DE FALTANTES (almacén columnar + cambios por renglón) ---
+# El carrito guarda una lista por columna y un número de versión. La tabla que se le pasa a
+# st.data_editor se arma una sola vez por versión; lo que el usuario edita llega como deltas
+# (edited_rows / added_rows / deleted_rows) y se aplica aquí directamente, sin reconstruir
+# el DataFrame ni compararlo completo en cada rerun.
+
+
+class Carrito:
+    def __init__(self):
+        self.columnas = {c: [] for c in COLUMNAS_PEDIDO}
+        self.version = 0
+        self._vista = None
+
+    def __len__(self):
+        return len(self.columnas[COLUMNAS_PEDIDO[0]])
+
+    def _cambio(self):
+        self.version += 1
+        self._vista = None
+
+    def agregar(self, item):
+        for c, valores in self.columnas.items():
+            valores.append(item.get(c))
+        self._cambio()
+
+    def agregar_varios(self, df):
+        # Muchos renglones de una vez (captura masiva): una sola versión nueva
+        for c, valores in self.columnas.items():
+            valores.extend(df[c].tolist() if c in df else [None] * len(df))
+        self._cambio()
+
+    def vaciar(self):
+        for valores in self.columnas.values():
+            valores.clear()
+        self._cambio()
+
+    def aplicar_cambios(self, cambios):
+        # 'cambios' es el estado de st.data_editor; los índices se refieren a la vista actual
+        if not cambios: return False
+        editados = cambios.get('edited_rows') or {}
+        agregados = cambios.get('added_rows') or []
+        borrados = set(cambios.get('deleted_rows') or [])
+        if not (editados or agregados or borrados): return False
+
+        for fila, valores in editados.items():
+            fila = int(fila)
+            for c, v in valores.items():
+                if c in self.columnas: self.columnas[c][fila] = v
+        if borrados:
+            for c in self.columnas:
+                self.columnas[c] = [v for i, v in enumerate(self.columnas[c]) if i not in borrados]
+        for item in agregados:
+            for c, valores in self.columnas.items():
+                valores.append(item.get(c))
+        self._cambio()
+        return True
+
+    def vista(self):
+        # DataFrame para mostrar/editar; se reutiliza mientras no cambie la versión
+        if self._vista is None:
+            self._vista = pd.DataFrame(self.columnas, columns=COLUMNAS_PEDIDO)
+        return self._vista
+
+    def registros(self):
+        return [dict(zip(COLUMNAS_PEDIDO, fila)) for fila in zip(*self.columnas.values())]
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+
+from config import FILE_CLIENTES, FILE_PRODUCTOS
+import ingesta
+from indices_catalogo import IndicesCatalogo
+from ingesta import Columna, Esquema, TIPO_CODIGO
+from rendimiento import medir
+from sincronizacion import sha1_archivo
+
+# --- CARGA DE CATÁLOGOS MAESTROS (CLIENTES Y PRODUCTOS) ---
+# Sin Streamlit: la usan la app (a través de VigilanteCatalogos) y el generador por lotes.
+# Cada CSV se lee una sola vez con ingesta.leer (codificación y columnas detectadas por nombre).
+ESQUEMA_CLIENTES = Esquema('clientes', [
+    Columna('CODIGO', ('CLAVE', 'CODIGO'), 0, TIPO_CODIGO),
+    Columna('NOMBRE', ('CLIENTE', 'NOMBRE'), 1),
+])
+ESQUEMA_PRODUCTOS = Esquema('productos', [
+    Columna('CODIGO', ('CLAVE', 'CODIGO'), None, TIPO_CODIGO),
+    Columna('DESCRIPCION', ('NOMBRE', 'DESCRIPCION'), None),
+    Columna('SUSTANCIA', ('SUSTANCIA',), None, requerida=False),
+])
+
+def cargar_catalogos(file_clientes=FILE_CLIENTES, file_productos=FILE_PRODUCTOS):
+    df_cli, errores_cli = cargar_clientes(file_clientes)
+    df_prod, errores_prod = cargar_productos(file_productos)
+    return df_cli, df_prod, errores_cli + errores_prod
+
+
+def cargar_clientes(file_clientes=FILE_CLIENTES):
+    errores = []
+    df_cli = pd.DataFrame()
+    try:
+        df_cli = ingesta.leer(file_clientes, ESQUEMA_CLIENTES).df
+        df_cli['DISPLAY'] = df_cli['CODIGO'].astype(str) + " - " + df_cli['NOMBRE'].astype(str)
+    except Exception as e:
+        errores.append(f"Clientes: {e}")
+    return df_cli, errores
+
+
+def cargar_productos(file_productos=FILE_PRODUCTOS):
+    # Catálogo maestro
+    errores = []
+    df_prod = pd.DataFrame()
+    try:
+        df_prod = ingesta.leer(file_productos, ESQUEMA_PRODUCTOS).df
+        # Sin columna SUSTANCIA en el archivo queda toda vacía
+        df_prod['SUSTANCIA'] = df_prod['SUSTANCIA'].fillna('---')
+
+        # --- LIMPIEZA AGRESIVA (NUEVO) ---
+        # 1. Asegurar que el código sea texto limpio (sin espacios invisibles)
+        df_prod['CODIGO'] = df_prod['CODIGO'].astype(str).str.strip()
+        
+        # 2. Eliminar códigos duplicados (Se queda con la primera aparición)
+        # Esto soluciona que te salgan "varias filas" si el código se repite en el archivo
+        df_prod = df_prod.drop_duplicates(subset=['CODIGO'], keep='first')
+        
+        # 3. Eliminar productos sin nombre
+        df_prod = df_prod.dropna(subset=['DESCRIPCION'])
+        # ---------------------------------
+
+        # Índice de búsqueda optimizado
+        df_prod['SEARCH_INDEX'] = (
+            df_prod['CODIGO'] + " | " + 
+            df_prod['DESCRIPCION'].astype(str) + " | " + 
+            df_prod['SUSTANCIA'].astype(str)
+        ).str.upper()
+        
+    except Exception as e:
+        errores.append(f"Productos: {e}")
+    return df_prod, errores
+
+
+# --- RECARGA EN CALIENTE DE LOS CATÁLOGOS ---
+# Un hilo por servidor revisa cada 'intervalo' segundos la fecha y el tamaño de los CSV. Si
+# cambiaron se compara el hash del contenido y, solo si es distinto, se vuelve a leer ESE
+# archivo, se rehacen sus índices (el buscador de productos, de forma incremental) y se publica
+# una VersionCatalogos nueva con una sola asignación: cada rerun ve la versión vieja o la
+# nueva completa, sin reiniciar el servidor ni perder las sesiones.
+INTERVALO_VIGILANCIA = 30  # segundos
+# Un archivo modificado hace menos de esto puede estar a medio copiar: se espera a la siguiente vuelta
+ESPERA_ESCRITURA = 2  # segundos
+
+VersionCatalogos = namedtuple('VersionCatalogos', ['df_clientes', 'df_productos', 'errores', 'indices', 'huellas', 'cargado'])
+CARGADORES = {'clientes': cargar_clientes, 'productos': cargar_productos}
+
+
+def firma_archivo(ruta):
+    try:
+        stat = os.stat(ruta)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+class VigilanteCatalogos:
+    def __init__(self, file_clientes=FILE_CLIENTES, file_productos=FILE_PRODUCTOS, intervalo=INTERVALO_VIGILANCIA):
+        self.rutas = {'clientes': file_clientes, 'productos': file_productos}
+        self.intervalo = intervalo
+        self.actual = None
+        self.ultimo_error = None
+
+        self._firmas = {}
+        self._errores = {}
+        self._suscriptores = []
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        # La primera carga es síncrona: la app no arranca sin catálogos
+        self.revisar()
+
+    def suscribir(self, funcion):
+        # 'funcion(version)' se llama con cada VersionCatalogos nueva (p. ej. el refrescador de inventario)
+        self._suscriptores.append(funcion)
+
+    def revisar(self):
+        # True si se publicó una versión nueva
+        with self._lock:
+            try:
+                firmas = {k: firma_archivo(r) for k, r in self.rutas.items()}
+                if self.actual is not None and firmas == self._firmas: return False
+                if self.actual is not None and any(f and time.time() - f[0] / 1e9 < ESPERA_ESCRITURA for f in firmas.values()): return False
+                previo = self.actual
+                # Las vueltas con la misma firma no se miden (serían dos por minuto); desde aquí cada
+                # revisión lee los archivos completos y cuenta como 'hit' o 'miss'
+                with medir('cargar_catalogos', cache='miss') as m:
+                    huellas = {k: sha1_archivo(r) if firmas[k] else None for k, r in self.rutas.items()}
+                    firmas_previas, self._firmas = self._firmas, firmas
+                    # Solo cambió la fecha (copiado encima con el mismo contenido): nada que rehacer
+                    if previo is not None and huellas == previo.huellas:
+                        m['cache'] = 'hit'
+                        return False
+
+                    datos, fallidos = {}, []
+                    for llave, ruta in self.rutas.items():
+                        anterior = None
+                        if previo is not None: anterior = previo.df_clientes if llave == 'clientes' else previo.df_productos
+                        if previo is not None and huellas[llave] == previo.huellas[llave]:
+                            datos[llave] = anterior
+                            continue
+                        df, errores = CARGADORES[llave](ruta)
+                        if anterior is not None and (errores or (df.empty and not anterior.empty)):
+                            # Archivo a medio guardar o mal formado: se sigue con la versión anterior de
+                            # ESE archivo y se reintenta en la siguiente vuelta (su firma no se actualiza)
+                            fallidos += errores or [f"{llave.capitalize()}: el archivo no trae renglones"]
+                            datos[llave] = anterior
+                            huellas[llave] = previo.huellas[llave]
+                            self._firmas[llave] = firmas_previas.get(llave)
+                            continue
+                        datos[llave], self._errores[llave] = df, errores
+                        m.setdefault('recargados', []).append(llave)
+                    if fallidos: m['fallidos'] = len(fallidos)
+
+                    if previo is not None and not m.get('recargados'):
+                        self.ultimo_error = f"Error: {'; '.join(fallidos)}"
+                        return False
+                    # Los índices de lo que no cambió se reutilizan (ver IndicesCatalogo)
+                    indices = IndicesCatalogo(datos['clientes'], datos['productos'], previo.indices if previo is not None else None)
+                    errores = self._errores.get('clientes', []) + self._errores.get('productos', [])
+                    self.actual = VersionCatalogos(datos['clientes'], datos['productos'], errores, indices, huellas, datetime.now())
+                    m.update(clientes=len(datos['clientes']), productos=len(datos['productos']))
+                self.ultimo_error = f"Error: {'; '.join(fallidos)}" if fallidos else None
+            except Exception as e:
+                # Se sigue sirviendo la última versión buena
+                self.ultimo_error = f"Error: {e}"
+                return False
+
+        for funcion in self._suscriptores:
+            try: funcion(self.actual)
+            except Exception as e: self.ultimo_error = f"Error: {e}"
+        return True
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo):
+            self.revisar()
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="vigilante-catalogos", daemon=True)
+            self._hilo.start()
+        return self
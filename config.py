@@ -0,0 +1,27 @@
+import os
+
+# --- ARCHIVOS EN GITHUB ---
+FILE_CLIENTES = 'clientes.csv'
+FILE_PRODUCTOS = 'productos.csv'
+FILE_PLANTILLA = 'plantilla.xlsx'
+FILE_IMAGEN = 'logo.png'
+
+# --- DATOS FIJOS DEL REPORTE DE FALTANTES ---
+SUCURSAL = "SUC. TIJ"
+AGENTE = "LUIS FELIPE GARCÍA DOMÍNGUEZ"
+
+# --- CONFIGURACIÓN DE CARPETA DRIVE ---
+# Pega aquí el ID de tu CARPETA PÚBLICA (lo que sigue de folders/...)
+DRIVE_FOLDER_ID = "1bvF7yuIRiJQ0oiXiZ6s3JD8goy1DUi1K"  # <--- ¡PÉGALO AQUÍ!
+DIRECTORIO_DRIVE = './temp_drive_folder'
+
+# Opcional: carpeta local (montada en el servidor) en lugar de Drive.
+# También la usan los benchmarks para no depender de la red.
+CARPETA_INVENTARIO_LOCAL = os.environ.get('CARPETA_INVENTARIO')
+
+# Opcional: la carpeta trae un inventario por sucursal/almacén (MULTI_SUCURSAL=1).
+# Se cargan todos y la búsqueda muestra una columna de existencia por sucursal.
+MULTI_SUCURSAL = os.environ.get('MULTI_SUCURSAL', '0') == '1'
+
+# --- BASE LOCAL DE PEDIDOS (SQLite) ---
+BASE_PEDIDOS = os.environ.get('BASE_PEDIDOS', './pedidos.sqlite')
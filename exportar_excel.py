@@ -0,0 +1,245 @@
+import functools
+import os
+from io import BytesIO
+
+from config import FILE_PLANTILLA, FILE_IMAGEN, SUCURSAL, AGENTE
+
+# --- GENERADOR DE Faltantes.xlsx ---
+# La plantilla se lee con openpyxl UNA sola vez (por versión del archivo) y se reduce a un
+# "layout": celdas con valor, estilos, anchos, altos y celdas combinadas. Cada pedido se
+# escribe después con xlsxwriter aplicando ese layout: sin copy_worksheet, sin volver a
+# leer la plantilla y con el logo incrustado una sola vez (xlsxwriter reutiliza imágenes
+# idénticas entre hojas).
+
+COLUMNAS_PEDIDO = ['CODIGO', 'DESCRIPCION', 'SOLICITADA', 'SURTIDO', 'O.C.']
+FILA_INICIO_ITEMS = 9  # fila 10 de Excel (base 0)
+ANCHO_LOGO, ALTO_LOGO = 270, 80  # píxeles
+
+
+def _color(color):
+    # Colores ARGB de openpyxl ('FFFF3B3B') -> '#FF3B3B'; los de tema/índice se ignoran
+    if color is None or color.type != 'rgb' or not isinstance(color.rgb, str): return None
+    if color.rgb in ('00000000',): return None
+    return '#' + color.rgb[-6:]
+
+
+BORDES = {'thin': 1, 'medium': 2, 'dashed': 3, 'dotted': 4, 'thick': 5, 'double': 6, 'hair': 7,
+          'mediumDashed': 8, 'dashDot': 9, 'mediumDashDot': 10, 'dashDotDot': 11,
+          'mediumDashDotDot': 12, 'slantDashDot': 13}
+
+
+def _formato(celda):
+    # Traduce el estilo de una celda openpyxl a las propiedades de un formato xlsxwriter
+    f = {}
+    fuente = celda.font
+    if fuente is not None:
+        if fuente.name: f['font_name'] = fuente.name
+        if fuente.sz: f['font_size'] = float(fuente.sz)
+        if fuente.b: f['bold'] = True
+        if fuente.i: f['italic'] = True
+        if _color(fuente.color): f['font_color'] = _color(fuente.color)
+    if celda.fill is not None and celda.fill.fill_type == 'solid' and _color(celda.fill.fgColor):
+        f['pattern'] = 1
+        f['bg_color'] = _color(celda.fill.fgColor)
+    for lado in ('left', 'right', 'top', 'bottom'):
+        borde = getattr(celda.border, lado)
+        if borde is not None and borde.style in BORDES:
+            f[lado] = BORDES[borde.style]
+            if _color(borde.color): f[f'{lado}_color'] = _color(borde.color)
+    alineacion = celda.alignment
+    if alineacion is not None:
+        if alineacion.horizontal: f['align'] = alineacion.horizontal
+        if alineacion.vertical: f['valign'] = {'center': 'vcenter'}.get(alineacion.vertical, alineacion.vertical)
+        if alineacion.wrap_text: f['text_wrap'] = True
+    if celda.number_format and celda.number_format != 'General': f['num_format'] = celda.number_format
+    return tuple(sorted(f.items()))
+
+
+class LayoutPlantilla:
+    def __init__(self, ruta):
+        import openpyxl
+        wb = openpyxl.load_workbook(ruta)
+        ws = wb.active
+
+        self.estilos = []          # propiedades de formato, sin repetir
+        ids = {}
+        self.celdas = {}           # (fila, col) base 0 -> (valor, id_estilo)
+        for fila in ws.iter_rows():
+            for c in fila:
+                estilo = _formato(c) if c.has_style else ()
+                if c.value is None and not estilo: continue
+                if estilo not in ids:
+                    ids[estilo] = len(self.estilos)
+                    self.estilos.append(dict(estilo))
+                self.celdas[(c.row - 1, c.column - 1)] = (c.value, ids[estilo])
+
+        from openpyxl.utils import column_index_from_string
+        self.anchos = {column_index_from_string(k) - 1: d.width for k, d in ws.column_dimensions.items() if d.width}
+        self.altos = {k - 1: d.height for k, d in ws.row_dimensions.items() if d.height}
+        self.combinadas = [(r.min_row - 1, r.min_col - 1, r.max_row - 1, r.max_col - 1) for r in ws.merged_cells.ranges]
+        self.horizontal = ws.page_setup.orientation == 'landscape'
+        self._tramos = {}
+        wb.close()
+
+    def estilo_en(self, fila, col):
+        celda = self.celdas.get((fila, col))
+        return celda[1] if celda else None
+
+    def tramos(self, fila, ancho):
+        # Columnas 0..ancho-1 del renglón en tramos contiguos con el mismo estilo: [(desde, hasta, id_estilo)].
+        # Cada tramo se escribe con un solo write_row; fuera de la tabla de la plantilla es uno solo.
+        llave = (fila, ancho)
+        tramos = self._tramos.get(llave)
+        if tramos is None:
+            tramos = []
+            for col in range(ancho):
+                estilo = self.estilo_en(fila, col)
+                if tramos and tramos[-1][2] == estilo: tramos[-1] = (tramos[-1][0], col + 1, estilo)
+                else: tramos.append((col, col + 1, estilo))
+            self._tramos[llave] = tramos
+        return tramos
+
+
+@functools.lru_cache(maxsize=4)
+def _layout(ruta, mtime):
+    return LayoutPlantilla(ruta)
+
+
+def cargar_layout(ruta=FILE_PLANTILLA):
+    # Cacheado por ruta + fecha de modificación: si cambian la plantilla se vuelve a leer
+    return _layout(ruta, os.path.getmtime(ruta))
+
+
+@functools.lru_cache(maxsize=4)
+def _logo(ruta, mtime):
+    from PIL import Image
+    with open(ruta, 'rb') as f:
+        datos = f.read()
+    with Image.open(BytesIO(datos)) as img:
+        ancho, alto = img.size
+        dpi_x, dpi_y = img.info.get('dpi', (96, 96))
+    # xlsxwriter escala según el DPI de la imagen; se compensa para mostrar 270x80 px
+    escala = {'x_scale': ANCHO_LOGO * dpi_x / (96 * ancho), 'y_scale': ALTO_LOGO * dpi_y / (96 * alto)}
+    return datos, escala
+
+
+def cargar_logo(ruta=FILE_IMAGEN):
+    try: return _logo(ruta, os.path.getmtime(ruta))
+    except Exception: return None
+
+
+def nombres_de_hoja(pedidos):
+    # Mismo cliente varias veces: '20272', '20272-2', '20272-3', ...
+    conteo = {}
+    nombres = []
+    for p in pedidos:
+        cod = p['cli_cod']
+        conteo[cod] = conteo.get(cod, 0) + 1
+        nombres.append(cod if conteo[cod] == 1 else f"{cod}-{conteo[cod]}")
+    return nombres
+
+
+def generar_faltantes(pedidos, plantilla=FILE_PLANTILLA, logo=FILE_IMAGEN, sucursal=SUCURSAL, agente=AGENTE):
+    # Devuelve los bytes del .xlsx con una hoja por pedido
+    import xlsxwriter
+
+    layout = cargar_layout(plantilla)
+    imagen = cargar_logo(logo)
+
+    buf = BytesIO()
+    wb = xlsxwriter.Workbook(buf, {'in_memory': True})
+    formatos = [wb.add_format(props) for props in layout.estilos]
+    combinadas = {(r1, c1) for r1, c1, _, _ in layout.combinadas}
+
+    def escribir(ws, fila, col, valor):
+        estilo = layout.estilo_en(fila, col)
+        ws.write(fila, col, valor, formatos[estilo] if estilo is not None else None)
+
+    for p, nom_hoja in zip(pedidos, nombres_de_hoja(pedidos)):
+        ws = wb.add_worksheet(nom_hoja)
+        if layout.horizontal: ws.set_landscape()
+        for col, ancho in layout.anchos.items(): ws.set_column(col, col, ancho)
+        for fila, alto in layout.altos.items(): ws.set_row(fila, alto)
+
+        # Contenido fijo de la plantilla (encabezados y bordes de la tabla)
+        for (fila, col), (valor, estilo) in layout.celdas.items():
+            if (fila, col) in combinadas: continue
+            ws.write(fila, col, valor, formatos[estilo])
+        for r1, c1, r2, c2 in layout.combinadas:
+            valor, estilo = layout.celdas.get((r1, c1), (None, None))
+            ws.merge_range(r1, c1, r2, c2, valor if valor is not None else '', formatos[estilo] if estilo is not None else None)
+
+        # Datos del pedido
+        cod = p['cli_cod']
+        escribir(ws, 1, 1, sucursal)
+        escribir(ws, 2, 1, agente)
+        escribir(ws, 3, 1, p['cli_nom'])
+        escribir(ws, 5, 3, p['fecha'].strftime('%d/%m/%Y'))
+        try: escribir(ws, 5, 1, int(cod))
+        except: escribir(ws, 5, 1, cod)
+
+        if imagen is not None:
+            datos, escala = imagen
+            ws.insert_image('D1', 'logo.png', dict(escala, image_data=BytesIO(datos)))
+
+        # Renglones del pedido: un solo paso a listas y un write_row por tramo de estilo (NaN -> celda vacía)
+        datos_items = p['items'][COLUMNAS_PEDIDO].values.tolist()
+        for idx, row in enumerate(datos_items):
+            fila = FILA_INICIO_ITEMS + idx
+            valores = [None if v != v else v for v in row]
+            for desde, hasta, estilo in layout.tramos(fila, len(valores)):
+                ws.write_row(fila, desde, valores[desde:hasta], formatos[estilo] if estilo is not None else None)
+
+    wb.close()
+    return buf.getvalue()
+
+
+# --- EXPORTACIÓN: UN LIBRO POR CLIENTE (ZIP) ---
+# Los pedidos se agrupan por cli_cod y cada libro se genera en un proceso aparte; el
+# ZIP se va armando conforme llegan los libros (en el orden de los clientes). Con pocos
+# clientes no conviene levantar procesos y se generan en el mismo hilo.
+
+MIN_CLIENTES_PARALELO = 4
+
+
+def agrupar_por_cliente(pedidos):
+    # cli_cod -> pedidos, respetando el orden en que apareció cada cliente
+    grupos = {}
+    for p in pedidos:
+        grupos.setdefault(p['cli_cod'], []).append(p)
+    return grupos
+
+
+def nombre_seguro(texto):
+    # Solo letras, números, '-' y '_' (nombres de archivo y de entradas del ZIP)
+    return ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in str(texto))
+
+
+def nombre_archivo_cliente(cod):
+    return f"Faltantes_{nombre_seguro(cod)}.xlsx"
+
+
+def _libro_cliente(args):
+    # Corre en el proceso hijo: cada uno cachea su propio layout y logo
+    cod, pedidos, plantilla, logo, sucursal, agente = args
+    return nombre_archivo_cliente(cod), generar_faltantes(pedidos, plantilla, logo, sucursal, agente)
+
+
+def generar_zip_por_cliente(pedidos, plantilla=FILE_PLANTILLA, logo=FILE_IMAGEN, sucursal=SUCURSAL, agente=AGENTE, procesos=None):
+    import zipfile
+
+    tareas = [(cod, grupo, plantilla, logo, sucursal, agente) for cod, grupo in agrupar_por_cliente(pedidos).items()]
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+
+    buf = BytesIO()
+    # Los .xlsx ya vienen comprimidos: se guardan sin volver a comprimir
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_STORED) as zf:
+        if procesos < 2 or len(tareas) < MIN_CLIENTES_PARALELO:
+            for tarea in tareas:
+                zf.writestr(*_libro_cliente(tarea))
+        else:
+            from paralelo import pool_spawn
+            with pool_spawn(procesos) as pool:
+                for nombre, datos in pool.map(_libro_cliente, tareas, chunksize=max(1, len(tareas) // (procesos * 4))):
+                    zf.writestr(nombre, datos)
+    return buf.getvalue()
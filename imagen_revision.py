@@ -0,0 +1,125 @@
+from io import BytesIO
+
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
+
+from inventario import COLORES_IMAGEN, ESTADO_NO_DISPONIBLE, ESTADO_SOLO_CORTA_CAD
+
+# --- IMAGEN PNG DE LA LISTA DE REVISIÓN (dibujada directo con Pillow) ---
+# Mismo resultado visual que la tabla de matplotlib (título, colores por estado y leyenda)
+# pero sin figura ni ajuste de 'bbox_inches': se mide el texto, se dibujan rectángulos y listo.
+# Las listas muy largas se parten en varias páginas (una imagen por página).
+
+DPI = 150
+FILAS_POR_PAGINA = 50
+
+
+def _pt(puntos):
+    # Tamaños en puntos tipográficos -> píxeles al DPI de exportación
+    return round(puntos * DPI / 72)
+
+
+MARGEN = _pt(36)            # media pulgada de margen blanco
+PAD_CELDA = _pt(4)
+ALTO_FILA = _pt(17)         # equivale a fontsize=11 con tabla.scale(1, 1.5)
+COLOR_BORDE = '#000000'
+COLOR_TEXTO = '#000000'
+
+
+def _fuente(puntos, negrita=False):
+    nombres = ['DejaVuSans-Bold.ttf', 'arialbd.ttf'] if negrita else ['DejaVuSans.ttf', 'arial.ttf']
+    for nombre in nombres:
+        try: return ImageFont.truetype(nombre, _pt(puntos))
+        except OSError: continue
+    return ImageFont.load_default(size=_pt(puntos))
+
+
+FUENTE_CELDA = _fuente(11)
+FUENTE_TITULO = _fuente(16, negrita=True)
+FUENTE_LEYENDA = _fuente(10)
+
+
+def _texto_celda(valor):
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)): return '-'
+    return str(valor)
+
+
+def _dibujar_pagina(encabezados, filas, colores, anchos, titulo, leyendas):
+    ancho_tabla = sum(anchos)
+    alto_tabla = ALTO_FILA * (len(filas) + 1)
+
+    alto_titulo = 0
+    if titulo:
+        caja = ImageDraw.Draw(Image.new('RGB', (1, 1))).multiline_textbbox((0, 0), titulo, font=FUENTE_TITULO, align='center')
+        alto_titulo = caja[3] - caja[1] + _pt(20)
+        ancho_titulo = caja[2] - caja[0]
+    else:
+        ancho_titulo = 0
+
+    alto_leyenda = _pt(10) + _pt(8) if leyendas else 0
+    ancho = max(ancho_tabla, ancho_titulo) + 2 * MARGEN
+    alto = alto_titulo + alto_tabla + alto_leyenda + 2 * MARGEN
+
+    img = Image.new('RGB', (ancho, alto), 'white')
+    draw = ImageDraw.Draw(img)
+    x0 = (ancho - ancho_tabla) // 2
+    y = MARGEN
+
+    # Título centrado ("NOMBRE\nCÓDIGO")
+    if titulo:
+        draw.multiline_text((ancho // 2, y), titulo, font=FUENTE_TITULO, fill=COLOR_TEXTO, anchor='ma', align='center')
+        y += alto_titulo
+
+    # Encabezado + filas: rectángulo de color con borde y texto centrado
+    for textos, color in [(encabezados, '#ffffff')] + list(zip(filas, colores)):
+        x = x0
+        for texto, ancho_col in zip(textos, anchos):
+            draw.rectangle([x, y, x + ancho_col, y + ALTO_FILA], fill=color, outline=COLOR_BORDE)
+            draw.text((x + ancho_col // 2, y + ALTO_FILA // 2), texto, font=FUENTE_CELDA, fill=COLOR_TEXTO, anchor='mm')
+            x += ancho_col
+        y += ALTO_FILA
+
+    # Leyenda centrada bajo la tabla
+    if leyendas:
+        y += _pt(8)
+        lado = _pt(10)
+        sep = _pt(12)
+        piezas = [(color, etiqueta, lado + _pt(4) + round(FUENTE_LEYENDA.getlength(etiqueta))) for color, etiqueta in leyendas]
+        x = (ancho - (sum(p[2] for p in piezas) + sep * (len(piezas) - 1))) // 2
+        for color, etiqueta, ancho_pieza in piezas:
+            draw.rectangle([x, y, x + lado, y + lado], fill=color)
+            draw.text((x + lado + _pt(4), y + lado // 2), etiqueta, font=FUENTE_LEYENDA, fill=COLOR_TEXTO, anchor='lm')
+            x += ancho_pieza + sep
+
+    buf = BytesIO()
+    img.save(buf, format='PNG', dpi=(DPI, DPI), compress_level=1)
+    img.close()
+    return buf.getvalue()
+
+
+def renderizar_revision(df, estado, titulo=None, filas_por_pagina=FILAS_POR_PAGINA):
+    # df: columnas a mostrar; estado: Serie de clasificar_existencias alineada con df.
+    # Devuelve una lista de PNG (bytes), una por página.
+    encabezados = [str(c) for c in df.columns]
+    filas = [[_texto_celda(v) for v in fila] for fila in df.itertuples(index=False, name=None)]
+    colores = estado.map(COLORES_IMAGEN).astype(str).tolist()
+
+    # Ancho de cada columna = texto más largo (medido una vez por valor distinto) + relleno
+    anchos = []
+    for j, enc in enumerate(encabezados):
+        distintos = {enc} | {f[j] for f in filas}
+        anchos.append(round(max(FUENTE_CELDA.getlength(t) for t in distintos)) + 2 * PAD_CELDA)
+
+    leyendas = []
+    if (estado == ESTADO_SOLO_CORTA_CAD).any(): leyendas.append((COLORES_IMAGEN[ESTADO_SOLO_CORTA_CAD], ESTADO_SOLO_CORTA_CAD))
+    if (estado == ESTADO_NO_DISPONIBLE).any(): leyendas.append((COLORES_IMAGEN[ESTADO_NO_DISPONIBLE], ESTADO_NO_DISPONIBLE))
+
+    total_paginas = max(1, -(-len(filas) // filas_por_pagina))
+    paginas = []
+    for p in range(total_paginas):
+        ini, fin = p * filas_por_pagina, (p + 1) * filas_por_pagina
+        titulo_pag = titulo
+        if total_paginas > 1:
+            titulo_pag = f"{titulo}\n({p + 1}/{total_paginas})" if titulo else f"({p + 1}/{total_paginas})"
+        paginas.append(_dibujar_pagina(encabezados, filas[ini:fin], colores[ini:fin], anchos, titulo_pag, leyendas))
+    return paginas
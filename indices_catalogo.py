@@ -0,0 +1,64 @@
+import pandas as pd
+
+from buscador import IndiceBusqueda
+
+# --- ÍNDICES DE LOS CATÁLOGOS MAESTROS ---
+# Se arman una sola vez por versión del catálogo (ver VigilanteCatalogos en catalogos.py) y
+# los usan todas las vistas: la descripción o la SUSTANCIA de un código, la posición de un
+# cliente en el selector o su DISPLAY por clave son una consulta, no un recorrido.
+
+
+def _mapa(df, llave, valor):
+    # Series llave -> valor (claves únicas: se queda la primera aparición)
+    mapa = pd.Series(df[valor].to_numpy(), index=pd.Index(df[llave].astype(str).str.strip().to_numpy()), name=valor)
+    return mapa[~mapa.index.duplicated()]
+
+
+def mapa_sustancias(df_productos):
+    # CODIGO -> SUSTANCIA, para enriquecer inventarios con un solo Series.map
+    if df_productos.empty: return pd.Series(dtype=object)
+    return _mapa(df_productos, 'CODIGO', 'SUSTANCIA')
+
+
+class IndicesCatalogo:
+    def __init__(self, df_clientes, df_productos, anterior=None):
+        # 'anterior': índices de la versión previa (recarga en caliente). Si un catálogo es el mismo
+        # DataFrame se reutilizan sus índices tal cual; el buscador de productos se deriva del
+        # anterior, así que solo se reindexan los productos nuevos o cambiados.
+        self.df_clientes = df_clientes
+        self.df_productos = df_productos
+        if anterior is not None and anterior.df_productos is df_productos: self._copiar_productos(anterior)
+        else: self._indexar_productos(df_productos, anterior.buscador_productos if anterior is not None else None)
+        if anterior is not None and anterior.df_clientes is df_clientes: self._copiar_clientes(anterior)
+        else: self._indexar_clientes(df_clientes)
+
+    def _indexar_productos(self, df_productos, buscador_previo=None):
+        if df_productos.empty:
+            self.buscador_productos = IndiceBusqueda([])
+        else:
+            # Buscador de la vista "Reportar Faltantes"
+            if buscador_previo is not None and buscador_previo.codigos is not None:
+                self.buscador_productos, _ = buscador_previo.derivar(df_productos['SEARCH_INDEX'], df_productos['CODIGO'])
+            else:
+                self.buscador_productos = IndiceBusqueda(df_productos['SEARCH_INDEX'], codigos=df_productos['CODIGO'])
+        self.sustancias = mapa_sustancias(df_productos)
+        # CODIGO -> DESCRIPCION, para resolver listas completas de códigos con un solo map
+        self.descripciones = _mapa(df_productos, 'CODIGO', 'DESCRIPCION') if not df_productos.empty else pd.Series(dtype=object)
+
+    def _copiar_productos(self, anterior):
+        for nombre in ('buscador_productos', 'sustancias', 'descripciones'):
+            setattr(self, nombre, getattr(anterior, nombre))
+
+    def _indexar_clientes(self, df_clientes):
+        # DISPLAY del cliente -> posición en df_clientes, y buscador para los selectores paginados
+        displays = df_clientes['DISPLAY'].tolist() if 'DISPLAY' in df_clientes else []
+        self.clientes = displays
+        self.posicion_cliente = {}
+        for i, d in enumerate(displays): self.posicion_cliente.setdefault(d, i)
+        self.buscador_clientes = IndiceBusqueda(displays)
+        # Clave del cliente -> DISPLAY
+        self.cliente_por_codigo = _mapa(df_clientes, 'CODIGO', 'DISPLAY') if displays else pd.Series(dtype=object)
+
+    def _copiar_clientes(self, anterior):
+        for nombre in ('clientes', 'posicion_cliente', 'buscador_clientes', 'cliente_por_codigo'):
+            setattr(self, nombre, getattr(anterior, nombre))
@@ -0,0 +1,256 @@
+import csv
+import functools
+import importlib.util
+import re
+import threading
+from collections import namedtuple
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from buscador import normalizar
+
+# --- INGESTA DE ARCHIVOS: UNA SOLA LECTURA POR ARCHIVO ---
+# Inventario, catálogos y listas de pedidos entran por aquí:
+#   1. De un prefijo pequeño se detecta la codificación (BOM / UTF-8 válido / latin-1) y la fila
+#      de encabezados (la primera que nombra las columnas esperadas), sin reintentos con otra
+#      codificación ni lecturas de prueba.
+#   2. Las columnas se ubican por nombre una sola vez; el mapeo se guarda por formato de archivo
+#      (sus encabezados), así el archivo de mañana con el mismo formato no se vuelve a analizar.
+#   3. El archivo se parsea una sola vez y solo con las columnas que se usan.
+#   4. Se revisan los renglones: códigos vacíos o mal escritos y números que no son número.
+# Si ningún renglón nombra las columnas se usan posiciones fijas (formato histórico del inventario).
+
+TAM_PREFIJO = 64 * 1024  # bytes revisados para decidir la codificación
+LIMITE_CODIFICACION = 1024 * 1024  # hasta dónde se busca el primer byte no ASCII
+FILAS_PREFIJO = 20       # renglones donde se busca el encabezado
+MIN_COINCIDENCIAS = 2    # columnas reconocidas por nombre para aceptar un renglón como encabezado
+SEPARADORES_CSV = ',;\t|'
+_NO_ASCII = re.compile(rb'[\x80-\xff]')
+
+# python-calamine (opcional) lee xlsx mucho más rápido que openpyxl
+HAY_CALAMINE = importlib.util.find_spec('python_calamine') is not None
+
+TIPO_CODIGO = 'codigo'
+TIPO_TEXTO = 'texto'
+TIPO_NUMERO = 'numero'
+
+MOTIVO_SIN_CODIGO = 'SIN CÓDIGO (SE OMITE)'
+MOTIVO_CODIGO_ESPACIOS = 'CÓDIGO CON ESPACIOS'
+MOTIVO_NO_NUMERICO = 'NO ES NÚMERO'
+
+# destino: nombre final; claves: subcadenas aceptadas en el encabezado (sin acentos, mayúsculas);
+# posicion: columna a usar si ningún encabezado coincide (None = no hay respaldo)
+Columna = namedtuple('Columna', ['destino', 'claves', 'posicion', 'tipo', 'requerida'], defaults=[TIPO_TEXTO, True])
+# fila_defecto: fila del encabezado cuando no se reconoce ninguna (None = sin encabezado, los datos
+# empiezan en la primera fila)
+Esquema = namedtuple('Esquema', ['nombre', 'columnas', 'fila_defecto'], defaults=[0])
+# fila: índice (desde 0) del renglón de encabezados, -1 si no hay; posiciones: destino -> columna (o None)
+Layout = namedtuple('Layout', ['fila', 'posiciones', 'encabezados'])
+# fila_encabezado: número de renglón (desde 1) o None si el archivo no trae encabezado
+ReporteIngesta = namedtuple('ReporteIngesta', ['archivo', 'codificacion', 'fila_encabezado', 'columnas', 'filas', 'problemas', 'layout_en_cache'])
+Lectura = namedtuple('Lectura', ['df', 'reporte'])
+
+_layouts = {}  # (esquema, encabezados normalizados) -> Layout
+_lock_layouts = threading.Lock()
+
+
+def detectar_codificacion(contenido):
+    if contenido.startswith(b'\xef\xbb\xbf'): return 'utf-8-sig'
+    # Lo ASCII se lee igual en cualquiera de las dos: decide el primer byte que no lo es, si
+    # aparece en el primer LIMITE_CODIFICACION (no se recorre todo un archivo grande)
+    match = _NO_ASCII.search(contenido, 0, LIMITE_CODIFICACION)
+    if match is None: return 'utf-8'
+    muestra = contenido[match.start():match.start() + TAM_PREFIJO]
+    try: muestra.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Un carácter de varios bytes cortado al final de la muestra no cuenta
+        if e.reason != 'unexpected end of data': return 'latin-1'
+    return 'utf-8'
+
+
+def _texto_celda(valor):
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)): return ''
+    return normalizar(valor).strip()
+
+
+def _por_nombre(encabezados, esquema):
+    # destino -> columna, para las columnas del esquema que este renglón nombra
+    mapa, usadas = {}, set()
+    for col in esquema.columnas:
+        for clave in col.claves:
+            i = next((i for i, h in enumerate(encabezados) if i not in usadas and clave in h), None)
+            if i is not None:
+                mapa[col.destino] = i
+                usadas.add(i)
+                break
+    return mapa
+
+
+def _detectar_layout(filas, esquema):
+    minimo = min(MIN_COINCIDENCIAS, len(esquema.columnas))
+    mejor, mapa = None, {}
+    for i, fila in enumerate(filas):
+        encontrado = _por_nombre(fila, esquema)
+        if len(encontrado) >= minimo and len(encontrado) > len(mapa): mejor, mapa = i, encontrado
+    if mejor is None: mejor = esquema.fila_defecto if esquema.fila_defecto is not None else -1
+    encabezados = filas[mejor] if 0 <= mejor < len(filas) else ()
+    ancho = max((len(f) for f in filas), default=0)
+
+    posiciones = {}
+    for col in esquema.columnas:
+        pos = mapa.get(col.destino)
+        if pos is None and col.posicion is not None and col.posicion < ancho: pos = col.posicion
+        if pos is None and col.requerida: raise ValueError(f"no se encontró la columna {col.destino}")
+        posiciones[col.destino] = pos
+    return Layout(mejor, posiciones, tuple(encabezados)), bool(mapa)
+
+
+def buscar_layout(filas, esquema):
+    # (Layout, en_cache). 'filas': los primeros renglones del archivo como texto normalizado
+    for i, fila in enumerate(filas):
+        layout = _layouts.get((esquema.nombre, tuple(fila)))
+        if layout is not None: return layout._replace(fila=i), True
+    layout, por_nombre = _detectar_layout(filas, esquema)
+    # Solo se recuerda un formato reconocido por nombre (las posiciones fijas no tienen encabezado que comparar)
+    if por_nombre:
+        with _lock_layouts:
+            _layouts[(esquema.nombre, layout.encabezados)] = layout
+    return layout, False
+
+
+def _contenido(fuente):
+    if isinstance(fuente, (bytes, bytearray)): return bytes(fuente)
+    if isinstance(fuente, BytesIO): return fuente.getvalue()
+    if hasattr(fuente, 'read'):
+        fuente.seek(0)
+        return fuente.read()
+    with open(fuente, 'rb') as f:
+        return f.read()
+
+
+def detectar_separador(lineas):
+    # El que parte más renglones en el mismo número de campos (los títulos de arriba no cuentan)
+    mejor, puntaje = ',', (0, 0)
+    for separador in SEPARADORES_CSV:
+        campos = [len(fila) for fila in csv.reader(lineas, delimiter=separador) if len(fila) > 1]
+        if not campos: continue
+        comun = max(set(campos), key=lambda n: (campos.count(n), n))
+        if (campos.count(comun), comun) > puntaje: mejor, puntaje = separador, (campos.count(comun), comun)
+    return mejor
+
+
+def _leer_csv(fuente, esquema, dtype):
+    contenido = _contenido(fuente)
+    codificacion = detectar_codificacion(contenido)
+    prefijo = contenido[:TAM_PREFIJO].decode(codificacion, errors='ignore')
+    lineas = prefijo.splitlines()[:FILAS_PREFIJO]
+    separador = detectar_separador(lineas)
+    filas = [[_texto_celda(c) for c in fila] for fila in csv.reader(lineas, delimiter=separador)]
+
+    layout, en_cache = buscar_layout(filas, esquema)
+    usadas = sorted({p for p in layout.posiciones.values() if p is not None})
+    leer_csv = functools.partial(pd.read_csv, sep=separador, header=None, skiprows=layout.fila + 1,
+                                 usecols=usadas, dtype=dtype, skip_blank_lines=False)
+    try:
+        df = leer_csv(BytesIO(contenido), encoding=codificacion)
+    except UnicodeDecodeError:
+        # El primer acento latin-1 estaba más allá de LIMITE_CODIFICACION: única relectura posible
+        codificacion = 'latin-1'
+        df = leer_csv(BytesIO(contenido), encoding=codificacion)
+    df = df.rename(columns={p: d for d, p in layout.posiciones.items() if p is not None})
+    return df, layout, en_cache, codificacion
+
+
+def _leer_xlsx_streaming(fuente, esquema, dtype):
+    # Modo solo-lectura de openpyxl: recorre las filas sin construir el libro completo y guarda
+    # únicamente las columnas que se usan. El encabezado sale de los primeros renglones (se
+    # detiene ahí); el resto de la hoja se recorre una sola vez.
+    import openpyxl
+    wb = openpyxl.load_workbook(fuente, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        filas = [[_texto_celda(c) for c in fila] for fila in ws.iter_rows(max_row=FILAS_PREFIJO, values_only=True)]
+        layout, en_cache = buscar_layout(filas, esquema)
+        usadas = {d: p for d, p in layout.posiciones.items() if p is not None}
+        ultima = max(usadas.values())
+        columnas = {d: [] for d in usadas}
+        for fila in ws.iter_rows(min_row=layout.fila + 2, max_col=ultima + 1, values_only=True):
+            for destino, pos in usadas.items():
+                columnas[destino].append(fila[pos] if pos < len(fila) else None)
+    finally:
+        wb.close()
+    return pd.DataFrame(columnas, dtype=dtype), layout, en_cache
+
+
+def _leer_xlsx_calamine(fuente, esquema, dtype):
+    # calamine carga la hoja completa de una vez: el encabezado se busca ya en memoria
+    hoja = pd.read_excel(fuente, header=None, engine='calamine', dtype=dtype)
+    filas = [[_texto_celda(c) for c in fila] for fila in hoja.head(FILAS_PREFIJO).itertuples(index=False)]
+    layout, en_cache = buscar_layout(filas, esquema)
+    usadas = {d: p for d, p in layout.posiciones.items() if p is not None}
+    df = hoja.iloc[layout.fila + 1:, list(usadas.values())].reset_index(drop=True)
+    df.columns = list(usadas)
+    return df, layout, en_cache
+
+
+def validar(df, esquema, primera_fila=1):
+    # Renglones que no se pueden usar tal cual: FILA (número de renglón en el archivo), COLUMNA, VALOR, MOTIVO
+    partes = []
+    numero_fila = np.arange(len(df)) + primera_fila
+    for col in esquema.columnas:
+        if col.destino not in df.columns: continue
+        serie = df[col.destino]
+        # Una columna que pandas ya leyó como número no tiene nada que revisar como texto
+        numerica = pd.api.types.is_numeric_dtype(serie)
+        if col.tipo == TIPO_NUMERO and numerica: continue
+        vacio = serie.isna().to_numpy()
+        texto = serie.astype(str).str.strip() if not numerica else None
+        if texto is not None: vacio = vacio | (texto == '').to_numpy()
+        if col.tipo == TIPO_CODIGO:
+            # Sin código pero con otros datos (subtotales, notas): el renglón se pierde al procesar
+            otros = df.drop(columns=[col.destino])
+            con_datos = otros.notna().to_numpy().any(axis=1) if len(otros.columns) else np.zeros(len(df), dtype=bool)
+            sin_codigo = vacio & con_datos
+            espacios = np.zeros(len(df), dtype=bool)
+            if texto is not None: espacios = ~vacio & texto.str.contains(r'\s', regex=True).to_numpy()
+            motivos = [(sin_codigo, MOTIVO_SIN_CODIGO), (espacios, MOTIVO_CODIGO_ESPACIOS)]
+        elif col.tipo == TIPO_NUMERO:
+            motivos = [(~vacio & pd.to_numeric(serie, errors='coerce').isna().to_numpy(), MOTIVO_NO_NUMERICO)]
+        else:
+            continue
+        for malos, motivo in motivos:
+            if malos.any():
+                partes.append(pd.DataFrame({'FILA': numero_fila[malos], 'COLUMNA': col.destino,
+                                            'VALOR': serie[malos].astype(object).to_numpy(), 'MOTIVO': motivo}))
+    if not partes: return pd.DataFrame(columns=['FILA', 'COLUMNA', 'VALOR', 'MOTIVO'])
+    return pd.concat(partes, ignore_index=True).sort_values('FILA', kind='stable', ignore_index=True)
+
+
+def leer(fuente, esquema, nombre=None, dtype=None):
+    # 'fuente': ruta, bytes o buffer (subida local); 'nombre' da la extensión si no es ruta.
+    # Devuelve Lectura(df con las columnas del esquema, ReporteIngesta).
+    archivo = str(nombre or fuente)
+    if isinstance(fuente, (bytes, bytearray)): fuente = BytesIO(fuente)
+    codificacion = None
+    if archivo.lower().endswith('.csv'):
+        df, layout, en_cache, codificacion = _leer_csv(fuente, esquema, dtype)
+    elif HAY_CALAMINE:
+        df, layout, en_cache = _leer_xlsx_calamine(fuente, esquema, dtype)
+    else:
+        df, layout, en_cache = _leer_xlsx_streaming(fuente, esquema, dtype)
+
+    # Las opcionales que el archivo no trae quedan vacías
+    for col in esquema.columnas:
+        if col.destino not in df.columns: df[col.destino] = None
+    df = df[[c.destino for c in esquema.columnas]]
+
+    usadas = {d: p for d, p in layout.posiciones.items() if p is not None}
+    columnas = {d: (layout.encabezados[p] if p < len(layout.encabezados) and layout.encabezados[p] else f"columna {p + 1}")
+                for d, p in usadas.items()}
+    problemas = validar(df, esquema, layout.fila + 2)
+    # Renglones en blanco (después de validar, para que FILA siga siendo la del archivo)
+    df = df.dropna(how='all').reset_index(drop=True)
+    fila_encabezado = layout.fila + 1 if layout.fila >= 0 else None
+    return Lectura(df, ReporteIngesta(archivo, codificacion, fila_encabezado, columnas, len(df), problemas, en_cache))
@@ -0,0 +1,538 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from io import BytesIO
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+import ingesta
+from config import SUCURSAL
+from buscador import IndiceBusqueda
+from indices_catalogo import mapa_sustancias
+from ingesta import Columna, Esquema, TIPO_CODIGO, TIPO_NUMERO
+from rendimiento import medir
+from sincronizacion import sincronizar
+
+# --- INVENTARIO DIARIO: LECTURA, PROCESAMIENTO Y REFRESCO EN SEGUNDO PLANO ---
+
+ZONA_TIJUANA = pytz.timezone('America/Tijuana')
+# Subir cuando cambie la forma del DataFrame procesado o del índice (invalida el cache en disco)
+VERSION_PROCESADO = 3
+INTERVALO_REFRESCO = 600  # segundos
+# Con una fuente sin tamaño ni fecha (Drive) los archivos en uso se vuelven a bajar para comparar
+# su hash solo con "Recargar Nube" o cada tanto, no en cada vuelta del refrescador
+INTERVALO_REVISION = 6 * 3600  # segundos
+MAX_VERSIONES = 8
+
+# Foto inmutable del inventario: se reemplaza completa, nunca se modifica en sitio.
+# 'sha1' (hash del archivo de origen) es también su id de versión.
+# 'delta': cambios contra el inventario anterior (None si no hubo uno antes)
+# 'reportes': ReporteIngesta de cada archivo leído (vacío si todo salió del cache en disco)
+# 'posiciones': CODIGO -> fila del df (ver posiciones_por_codigo), compartido por todas las sesiones
+Snapshot = namedtuple('Snapshot', ['df', 'indice', 'nombre', 'fecha_mod', 'sha1', 'sincronizado', 'delta', 'reportes', 'posiciones'],
+                      defaults=[None, (), None])
+
+
+def fecha_local(timestamp):
+    # Interpretamos la fecha como UTC (hora del servidor) y la pasamos a hora de TIJUANA
+    dt_utc = datetime.fromtimestamp(timestamp, pytz.utc)
+    return dt_utc.astimezone(ZONA_TIJUANA)
+
+
+# Del archivo de inventario solo se usan estas columnas. Se ubican por nombre (ver ingesta.py);
+# si el archivo no trae encabezados reconocibles, por posición con el encabezado en la fila 2.
+POSICIONES_INVENTARIO = [0, 1, 5, 6]
+NOMBRES_INVENTARIO = ['CODIGO', 'PRODUCTO', 'CORTA_CAD', 'EXISTENCIA']
+ESQUEMA_INVENTARIO = Esquema('inventario', [
+    Columna('CODIGO', ('CLAVE', 'CODIGO'), POSICIONES_INVENTARIO[0], TIPO_CODIGO),
+    Columna('PRODUCTO', ('DESCRIPCION', 'PRODUCTO', 'NOMBRE'), POSICIONES_INVENTARIO[1]),
+    Columna('CORTA_CAD', ('CORTA',), POSICIONES_INVENTARIO[2], TIPO_NUMERO),
+    Columna('EXISTENCIA', ('EXIST',), POSICIONES_INVENTARIO[3], TIPO_NUMERO),
+], fila_defecto=1)
+
+
+def leer_inventario(ruta, nombre=None):
+    # 'ruta' puede ser un archivo en disco o un buffer (subida local); 'nombre' da la extensión.
+    # Lectura(df con CODIGO, PRODUCTO, CORTA_CAD, EXISTENCIA; ReporteIngesta con los renglones inválidos)
+    return ingesta.leer(ruta, ESQUEMA_INVENTARIO, nombre)
+
+
+def leer_archivo_inventario(ruta, nombre=None):
+    return leer_inventario(ruta, nombre).df
+
+
+def a_numerico(serie):
+    # Existencias como número desde la carga: enteros si todos lo son, decimales si no.
+    # Lo que no es número queda como vacío (<NA>) en vez de texto.
+    num = pd.to_numeric(serie, errors='coerce')
+    validos = num.dropna()
+    if (validos % 1 == 0).all(): return num.astype('Int64')
+    return num.astype('Float64')
+
+
+# --- CLASIFICACIÓN DE EXISTENCIAS (una sola regla para pantalla e imagen) ---
+ESTADO_NO_DISPONIBLE = 'NO DISPONIBLE'
+ESTADO_SOLO_CORTA_CAD = 'SOLO CORTA CAD.'
+ESTADO_OK = 'OK'
+ESTADOS = [ESTADO_NO_DISPONIBLE, ESTADO_SOLO_CORTA_CAD, ESTADO_OK]
+
+COLORES_PANTALLA = {ESTADO_NO_DISPONIBLE: 'background-color: #390D10', ESTADO_SOLO_CORTA_CAD: 'background-color: #4B3718', ESTADO_OK: ''}
+COLORES_IMAGEN = {ESTADO_NO_DISPONIBLE: '#fe9292', ESTADO_SOLO_CORTA_CAD: '#ffe59a', ESTADO_OK: '#ffffff'}
+
+
+def clasificar_existencias(df):
+    # Sin existencia ni corta caducidad -> NO DISPONIBLE; solo corta caducidad -> SOLO CORTA CAD.
+    # Valores vacíos o no numéricos cuentan como OK (no se colorean).
+    ex = pd.to_numeric(df['EXISTENCIA'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    cc = pd.to_numeric(df['CORTA_CAD'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    sin_existencia = ex == 0
+    estado = np.select(
+        [sin_existencia & (cc == 0), sin_existencia & (cc > 0)],
+        [ESTADO_NO_DISPONIBLE, ESTADO_SOLO_CORTA_CAD],
+        default=ESTADO_OK
+    )
+    return pd.Series(pd.Categorical(estado, categories=ESTADOS), index=df.index, name='ESTADO')
+
+
+# Lista de revisión (pantalla e imagen): columnas en este orden, '-' donde falte el dato
+COLUMNAS_REVISION = ['CODIGO', 'PRODUCTO', 'SUSTANCIA', 'EXISTENCIA', 'CORTA_CAD', 'SOLICITADO']
+
+
+def tabla_revision(df_rev):
+    df_rev = df_rev.copy()
+    for c in COLUMNAS_REVISION:
+        if c not in df_rev.columns: df_rev[c] = "-"
+    return df_rev[COLUMNAS_REVISION]
+
+
+def procesar_inventario(df_raw, df_productos, sustancias=None, previo=None):
+    # 'sustancias': CODIGO -> SUSTANCIA ya armado (IndicesCatalogo.sustancias); si no viene se arma aquí.
+    # 'previo': índice del inventario anterior, para reindexar solo las filas que cambiaron.
+    df_tj = df_raw[NOMBRES_INVENTARIO].copy()
+    df_tj = df_tj.dropna(subset=['CODIGO'])
+    df_tj['CODIGO'] = df_tj['CODIGO'].astype(str).str.strip()
+    df_tj['PRODUCTO'] = df_tj['PRODUCTO'].fillna('').astype(str)
+    df_tj['EXISTENCIA'] = a_numerico(df_tj['EXISTENCIA'])
+    df_tj['CORTA_CAD'] = a_numerico(df_tj['CORTA_CAD'])
+
+    if sustancias is None: sustancias = mapa_sustancias(df_productos)
+    df_tj['SUSTANCIA'] = df_tj['CODIGO'].map(sustancias).fillna('---').astype(str)
+
+    df_tj['INDICE_BUSQUEDA'] = (
+        df_tj['CODIGO'] + " " +
+        df_tj['PRODUCTO'] + " " +
+        df_tj['SUSTANCIA']
+    ).str.upper()
+
+    cols_finales = ['CODIGO', 'PRODUCTO', 'SUSTANCIA', 'EXISTENCIA', 'CORTA_CAD', 'INDICE_BUSQUEDA']
+    df_final = df_tj[cols_finales].reset_index(drop=True)
+    return df_final, indexar_inventario(df_final, previo)
+
+
+def indexar_inventario(df, previo=None):
+    # Índice invertido construido una sola vez por versión de inventario
+    with medir('indexar_inventario', filas=len(df)) as m:
+        if previo is None: return IndiceBusqueda(df['INDICE_BUSQUEDA'].fillna(''), codigos=df['CODIGO'])
+        indice, m['reutilizadas'] = previo.derivar(df['INDICE_BUSQUEDA'].fillna(''), df['CODIGO'])
+        return indice
+
+
+def posiciones_por_codigo(df):
+    # CODIGO -> primera fila del inventario, para unir listas de códigos (lista de revisión) sin recorrerlo.
+    # Se arma una vez por versión de inventario y viaja en su Snapshot.
+    mapa = pd.Series(np.arange(len(df)), index=df['CODIGO'].to_numpy())
+    return mapa[~mapa.index.duplicated()]
+
+
+def huella_catalogo(df_productos):
+    # El inventario procesado depende de la SUSTANCIA del catálogo: entra en la llave del cache
+    if df_productos.empty: return 'vacio'
+    return format(int(pd.util.hash_pandas_object(df_productos[['CODIGO', 'SUSTANCIA']], index=False).sum()) & 0xFFFFFFFFFFFF, 'x')
+
+
+def cargar_procesado(origen, nombre, sha1, df_productos, cache=None, sustancias=None, previo=None):
+    # (inventario procesado, índice, ReporteIngesta), leídos del cache en disco si este archivo ya
+    # se procesó antes (el reporte de esa primera lectura se guarda junto al parquet)
+    llave = f"{sha1}-{huella_catalogo(df_productos)}-v{VERSION_PROCESADO}"
+    with medir('cargar_procesado', archivo=nombre) as m:
+        if cache is not None:
+            encontrado = cache.leer(llave)
+            if encontrado is not None:
+                m.update(cache='hit', filas=len(encontrado[0]))
+                return encontrado
+        m['cache'] = 'miss'
+
+        with medir('leer_inventario', archivo=nombre) as m_leer:
+            if isinstance(origen, BytesIO): m_leer['bytes'] = len(origen.getbuffer())
+            df_raw, reporte = leer_inventario(origen, nombre)
+            m_leer.update(filas=len(df_raw), invalidos=len(reporte.problemas), layout='hit' if reporte.layout_en_cache else 'miss')
+        with medir('procesar_inventario', filas=len(df_raw)):
+            df, indice = procesar_inventario(df_raw, df_productos, sustancias, previo)
+        if cache is not None: cache.guardar(llave, df, indice, reporte)
+        m['filas'] = len(df)
+        return df, indice, reporte
+
+
+def snapshot_local(contenido, nombre, df_productos, cache=None, sustancias=None):
+    sha1 = hashlib.sha1(contenido).hexdigest()
+    df, indice, reporte = cargar_procesado(BytesIO(contenido), nombre, sha1, df_productos, cache, sustancias)
+    return Snapshot(df, indice, nombre, None, sha1, datetime.now(ZONA_TIJUANA), reportes=(reporte,) if reporte else (),
+                    posiciones=posiciones_por_codigo(df))
+
+
+# --- CAMBIOS ENTRE DOS INVENTARIOS (DÍA CONTRA DÍA) ---
+# Comparación vectorizada por CODIGO: códigos nuevos, códigos que ya no vienen y cambios de
+# existencia / corta caducidad en los que siguen. Se calcula una vez por archivo nuevo.
+CAMBIO_RESURTIDO = 'RESURTIDO'
+CAMBIO_AGOTADO = 'AGOTADO'
+CAMBIO_SUBIO = 'SUBIÓ'
+CAMBIO_BAJO = 'BAJÓ'
+CAMBIO_CORTA_CAD = 'CORTA CAD.'
+TIPOS_CAMBIO = [CAMBIO_RESURTIDO, CAMBIO_AGOTADO, CAMBIO_SUBIO, CAMBIO_BAJO, CAMBIO_CORTA_CAD]
+
+Delta = namedtuple('Delta', ['anterior', 'nuevos', 'eliminados', 'cambios'])
+
+
+def como_float(serie):
+    return pd.to_numeric(serie, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def distintos(a, b):
+    # Vacío contra vacío no es cambio (también lo usa la lista de revisión)
+    return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+
+def calcular_delta(df_antes, df_despues, anterior=None):
+    columnas = ['CODIGO', 'PRODUCTO', 'SUSTANCIA', 'EXISTENCIA', 'CORTA_CAD']
+    antes = df_antes[columnas].drop_duplicates('CODIGO').set_index('CODIGO')
+    despues = df_despues[columnas].drop_duplicates('CODIGO').set_index('CODIGO')
+
+    # get_indexer (tabla hash) en lugar de isin: con textos de Arrow isin recorre fila por fila
+    posicion_antes = antes.index.get_indexer(despues.index)
+    en_antes = posicion_antes >= 0
+    nuevos = despues[~en_antes].reset_index()
+    eliminados = antes[despues.index.get_indexer(antes.index) < 0].reset_index()
+
+    comunes = despues[en_antes]
+    previos = antes.iloc[posicion_antes[en_antes]]
+    ex_antes, ex = como_float(previos['EXISTENCIA']), como_float(comunes['EXISTENCIA'])
+    cc_antes, cc = como_float(previos['CORTA_CAD']), como_float(comunes['CORTA_CAD'])
+    cambio_ex = distintos(ex_antes, ex)
+    cambio = cambio_ex | distintos(cc_antes, cc)
+
+    tipo = np.select(
+        [cambio_ex & ~(ex_antes > 0) & (ex > 0), cambio_ex & (ex_antes > 0) & (ex == 0),
+         cambio_ex & (ex > ex_antes), cambio_ex],
+        [CAMBIO_RESURTIDO, CAMBIO_AGOTADO, CAMBIO_SUBIO, CAMBIO_BAJO],
+        default=CAMBIO_CORTA_CAD
+    )[cambio]
+    cambios = pd.DataFrame({
+        'CODIGO': comunes.index[cambio],
+        'PRODUCTO': comunes['PRODUCTO'].to_numpy()[cambio],
+        'SUSTANCIA': comunes['SUSTANCIA'].to_numpy()[cambio],
+        'CAMBIO': pd.Categorical(tipo, categories=TIPOS_CAMBIO),
+        'EXISTENCIA ANTES': previos['EXISTENCIA'].array[cambio],
+        'EXISTENCIA': comunes['EXISTENCIA'].array[cambio],
+        'CORTA_CAD ANTES': previos['CORTA_CAD'].array[cambio],
+        'CORTA_CAD': comunes['CORTA_CAD'].array[cambio],
+    })
+    return Delta(anterior, nuevos, eliminados, cambios)
+
+
+class AlmacenInventario:
+    # Versiones de inventario compartidas por TODAS las sesiones del servidor, llave = hash
+    # del archivo. Cada sesión guarda solo el id de versión, nunca su propia copia del DataFrame.
+    # Se conservan las 'max_versiones' usadas más recientemente.
+
+    def __init__(self, max_versiones=MAX_VERSIONES):
+        self.max_versiones = max_versiones
+        self._versiones = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._versiones)
+
+    def obtener(self, version):
+        with self._lock:
+            snapshot = self._versiones.get(version)
+            if snapshot is not None: self._versiones.move_to_end(version)
+            return snapshot
+
+    def publicar(self, snapshot):
+        with self._lock:
+            self._versiones[snapshot.sha1] = snapshot
+            self._versiones.move_to_end(snapshot.sha1)
+            while len(self._versiones) > self.max_versiones:
+                self._versiones.popitem(last=False)
+        return snapshot
+
+    def version_de(self, contenido):
+        return hashlib.sha1(contenido).hexdigest()
+
+
+def puntaje_novedad(archivo):
+    # Más reciente primero por fecha; a igual fecha gana la copia "(N)" más alta
+    match = re.search(r'\((\d+)\)\.', archivo.nombre)
+    version = int(match.group(1)) if match else 0
+    return (archivo.mtime, version)
+
+
+# --- VARIAS SUCURSALES (OPCIONAL, config.MULTI_SUCURSAL) ---
+# La carpeta trae un inventario por almacén. Se toma el más reciente de cada sucursal, los que
+# cambiaron se leen en paralelo y todo se une en una sola tabla por CODIGO: EXISTENCIA y
+# CORTA_CAD son los de la sucursal propia (config.SUCURSAL) y cada otra sucursal agrega una
+# columna con su existencia.
+# 'llave': la del cache en disco (hash del archivo + huella del catálogo); 'reporte': el de la
+# lectura del archivo (None si salió del cache)
+ArchivoSucursal = namedtuple('ArchivoSucursal', ['llave', 'df', 'indice', 'reporte'], defaults=[None])
+
+
+def sucursal_de_archivo(nombre):
+    # "INVENTARIO SUC. ENS 17-10 (2).xlsx" -> "SUC. ENS"; sin "SUC" se usa el nombre sin extensión ni "(N)"
+    match = re.search(r'\bSUC(?:URSAL)?\.?\s*([A-Z0-9]+)', nombre, re.IGNORECASE)
+    if match: return f"SUC. {match.group(1).upper()}"
+    return re.sub(r'\s*\(\d+\)$', '', os.path.splitext(nombre)[0]).strip().upper()
+
+
+def recientes_por_sucursal(archivos):
+    recientes = {}
+    for archivo in archivos:
+        sucursal = sucursal_de_archivo(archivo.nombre)
+        if sucursal not in recientes or puntaje_novedad(archivo) > puntaje_novedad(recientes[sucursal]):
+            recientes[sucursal] = archivo
+    return recientes
+
+
+def _leer_crudo(args):
+    # Corre en el proceso hijo
+    ruta, nombre = args
+    return leer_inventario(ruta, nombre)
+
+
+def leer_en_paralelo(archivos, procesos=None):
+    # archivos: [(ruta, nombre)]. Leer xlsx es CPU puro (openpyxl/calamine): un proceso por archivo
+    procesos = min(procesos or os.cpu_count() or 1, len(archivos))
+    if procesos < 2: return [_leer_crudo(a) for a in archivos]
+    from paralelo import pool_spawn
+    with pool_spawn(procesos) as pool:
+        return list(pool.map(_leer_crudo, archivos))
+
+
+def cargar_sucursales(recientes, df_productos, cache=None, sustancias=None, anteriores=None, procesos=None):
+    # recientes: {sucursal: ArchivoLocal}; anteriores: {sucursal: ArchivoSucursal} de la carga previa.
+    # Una sucursal cuyo archivo no cambió se reutiliza tal cual; las demás salen del cache en disco
+    # o se leen (en paralelo) y procesan, reindexando contra su versión anterior.
+    anteriores = anteriores or {}
+    cargadas, pendientes = {}, {}
+    huella = huella_catalogo(df_productos)
+    llaves = {s: f"{a.sha1}-{huella}-v{VERSION_PROCESADO}" for s, a in recientes.items()}
+    for sucursal, archivo in recientes.items():
+        previa = anteriores.get(sucursal)
+        if previa is not None and previa.llave == llaves[sucursal]:
+            cargadas[sucursal] = previa
+            continue
+        encontrado = cache.leer(llaves[sucursal]) if cache is not None else None
+        if encontrado is not None: cargadas[sucursal] = ArchivoSucursal(llaves[sucursal], *encontrado)
+        else: pendientes[sucursal] = archivo
+
+    if pendientes:
+        with medir('leer_sucursales', archivos=len(pendientes)) as m:
+            lecturas = leer_en_paralelo([(a.ruta, a.nombre) for a in pendientes.values()], procesos)
+            m['filas'] = sum(len(l.df) for l in lecturas)
+        for (sucursal, archivo), (df_raw, reporte) in zip(pendientes.items(), lecturas):
+            previa = anteriores.get(sucursal)
+            with medir('procesar_inventario', filas=len(df_raw), sucursal=sucursal):
+                df, indice = procesar_inventario(df_raw, df_productos, sustancias, previa.indice if previa is not None else None)
+            if cache is not None: cache.guardar(llaves[sucursal], df, indice, reporte)
+            cargadas[sucursal] = ArchivoSucursal(llaves[sucursal], df, indice, reporte)
+    return cargadas
+
+
+def unir_sucursales(por_sucursal, principal=SUCURSAL):
+    # por_sucursal: {sucursal: DataFrame procesado}. La sucursal propia va primero: manda en el
+    # orden de las filas y en el texto de PRODUCTO / SUSTANCIA.
+    orden = sorted(por_sucursal, key=lambda s: (s != principal, s))
+    partes = {s: por_sucursal[s].drop_duplicates('CODIGO').set_index('CODIGO') for s in orden}
+    base = pd.concat([p[['PRODUCTO', 'SUSTANCIA', 'INDICE_BUSQUEDA']] for p in partes.values()])
+    base = base[~base.index.duplicated()]
+
+    propia = partes.get(principal)
+    if propia is not None:
+        # Lo que la sucursal propia no trae cuenta como sin existencia aquí
+        base['EXISTENCIA'] = propia['EXISTENCIA'].reindex(base.index).fillna(0)
+        base['CORTA_CAD'] = propia['CORTA_CAD'].reindex(base.index).fillna(0)
+    else:
+        # Sin archivo propio: el total de todas las sucursales
+        base['EXISTENCIA'] = pd.concat([p['EXISTENCIA'].reindex(base.index) for p in partes.values()], axis=1).sum(axis=1, min_count=1)
+        base['CORTA_CAD'] = pd.concat([p['CORTA_CAD'].reindex(base.index) for p in partes.values()], axis=1).sum(axis=1, min_count=1)
+    otras = [s for s in orden if s != principal]
+    for s in otras:
+        base[s] = partes[s]['EXISTENCIA'].reindex(base.index)
+
+    columnas = ['CODIGO', 'PRODUCTO', 'SUSTANCIA', 'EXISTENCIA', 'CORTA_CAD'] + otras + ['INDICE_BUSQUEDA']
+    return base.rename_axis('CODIGO').reset_index()[columnas]
+
+
+class RefrescadorInventario:
+    # Un solo hilo por servidor: sincroniza la carpeta, procesa el archivo más reciente (o el
+    # más reciente de cada sucursal) y publica un Snapshot nuevo, con sus cambios contra el
+    # anterior. Las sesiones solo leen 'actual' (sin esperar a Drive).
+    # Si una sincronización falla se sigue sirviendo el último Snapshot bueno.
+
+    def __init__(self, fuente, directorio, df_productos, intervalo=INTERVALO_REFRESCO, almacen=None, cache=None, sustancias=None,
+                 multi_sucursal=False, procesos=None, intervalo_revision=INTERVALO_REVISION):
+        self.fuente = fuente
+        self.directorio = directorio
+        self.df_productos = df_productos
+        self.sustancias = sustancias
+        self.intervalo = intervalo
+        self.almacen = almacen
+        self.cache = cache
+        # multi_sucursal: un archivo por almacén, unidos en una tabla (ver unir_sucursales)
+        self.multi_sucursal = multi_sucursal
+        self.procesos = procesos
+        self._sucursales = {}
+        self.intervalo_revision = intervalo_revision
+        self._ultima_revision = None  # time.monotonic() de la última descarga forzada (ver refrescar)
+        # Sube con cada catálogo nuevo; el Snapshot se rehace aunque el archivo no haya cambiado
+        self._version_catalogo = 0
+        self._catalogo_publicado = 0
+
+        self.actual = None
+        self.ultimo_error = None
+        self.ultimo_intento = None
+
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._primera_carga = threading.Event()
+        self._forzar = False
+        self._hilo = None
+
+    def refrescar(self, forzar=False):
+        with self._lock:
+            try:
+                with medir('sincronizar', forzar=forzar) as m:
+                    resultado = sincronizar(self.fuente, self.directorio)
+                    # 'hit': el manifiesto dijo que no había nada nuevo que bajar
+                    m.update(archivos=len(resultado.archivos), descargados=len(resultado.descargados),
+                             cache='miss' if resultado.descargados else 'hit')
+                archivos = resultado.archivos
+                if archivos and self._toca_revision(forzar):
+                    # Vuelve a bajar los más recientes por si los reemplazaron en Drive con el mismo id
+                    # (si el hash es el mismo no se reprocesa nada)
+                    archivos = sincronizar(self.fuente, self.directorio, forzar=self._ids_vigentes(archivos)).archivos
+                    self._ultima_revision = time.monotonic()
+
+                if not archivos:
+                    self.ultimo_error = "⚠️ Carpeta vacía o sin acceso."
+                    return self.actual
+
+                if self.multi_sucursal: self._refrescar_sucursales(archivos)
+                else: self._refrescar_reciente(archivos)
+                self.ultimo_error = None
+            except Exception as e:
+                self.ultimo_error = f"Error: {str(e)}"
+            finally:
+                self.ultimo_intento = datetime.now(ZONA_TIJUANA)
+                self._primera_carga.set()
+            return self.actual
+
+    def _toca_revision(self, forzar):
+        if forzar: return True
+        if self.fuente.reporta_cambios: return False
+        return self._ultima_revision is None or time.monotonic() - self._ultima_revision >= self.intervalo_revision
+
+    def _ids_vigentes(self, archivos):
+        # El más reciente (o el más reciente de cada sucursal)
+        vigentes = recientes_por_sucursal(archivos).values() if self.multi_sucursal else [max(archivos, key=puntaje_novedad)]
+        return {a.id for a in vigentes}
+
+    def actualizar_catalogo(self, df_productos, sustancias):
+        # Llamado por el VigilanteCatalogos al recargar productos.csv: el siguiente refresco
+        # (inmediato) reprocesa el inventario vigente con las SUSTANCIAS nuevas
+        with self._lock:
+            self.df_productos = df_productos
+            self.sustancias = sustancias
+            self._version_catalogo += 1
+        self.solicitar()
+
+    def _vigente(self, sha1):
+        previo = self.actual
+        return previo is not None and previo.sha1 == sha1 and self._catalogo_publicado == self._version_catalogo
+
+    def _refrescar_reciente(self, archivos):
+        reciente = max(archivos, key=puntaje_novedad)
+        previo = self.actual
+        if self._vigente(reciente.sha1):
+            # Mismo archivo: no se vuelve a parsear, solo se actualiza la hora de sincronización
+            self.actual = previo._replace(sincronizado=datetime.now(ZONA_TIJUANA))
+            return
+        # Con un inventario previo solo se reindexan las filas que cambiaron
+        df, indice, reporte = cargar_procesado(reciente.ruta, reciente.nombre, reciente.sha1, self.df_productos, self.cache, self.sustancias,
+                                               previo.indice if previo is not None else None)
+        self._publicar(df, indice, reciente.nombre, reciente.mtime, reciente.sha1, (reporte,) if reporte else ())
+
+    def _refrescar_sucursales(self, archivos):
+        recientes = recientes_por_sucursal(archivos)
+        # Id de versión: combinación de los hashes de cada sucursal
+        sha1 = hashlib.sha1('|'.join(f"{s}:{a.sha1}" for s, a in sorted(recientes.items())).encode()).hexdigest()
+        previo = self.actual
+        if self._vigente(sha1):
+            self.actual = previo._replace(sincronizado=datetime.now(ZONA_TIJUANA))
+            return
+
+        self._sucursales = cargar_sucursales(recientes, self.df_productos, self.cache, self.sustancias, self._sucursales, self.procesos)
+        with medir('unir_sucursales', sucursales=len(recientes)) as m:
+            df = unir_sucursales({s: a.df for s, a in self._sucursales.items()})
+            m['filas'] = len(df)
+        # La primera vez el índice de la sucursal propia ya cubre casi todas las filas de la unión
+        propia = self._sucursales.get(SUCURSAL)
+        base = previo.indice if previo is not None else (propia.indice if propia is not None else None)
+        indice = indexar_inventario(df, base)
+        nombre = f"{len(recientes)} sucursales ({', '.join(sorted(recientes))})"
+        reportes = tuple(a.reporte for a in self._sucursales.values() if a.reporte is not None)
+        self._publicar(df, indice, nombre, max(a.mtime for a in recientes.values()), sha1, reportes)
+
+    def _publicar(self, df, indice, nombre, mtime, sha1, reportes=()):
+        previo = self.actual
+        delta = None
+        if previo is not None and previo.sha1 == sha1:
+            # Mismo archivo reprocesado por un catálogo nuevo: los cambios del día siguen siendo los mismos
+            delta = previo.delta
+            reportes = reportes or previo.reportes
+        elif previo is not None:
+            with medir('calcular_delta', filas=len(df)) as m:
+                delta = calcular_delta(previo.df, df, previo.nombre)
+                m.update(nuevos=len(delta.nuevos), eliminados=len(delta.eliminados), cambios=len(delta.cambios))
+        fecha_mod = fecha_local(mtime).strftime('%d/%m/%Y %H:%M')
+        # Asignación atómica: las sesiones ven el Snapshot viejo o el nuevo, nunca uno a medias
+        self.actual = Snapshot(df, indice, nombre, fecha_mod, sha1, datetime.now(ZONA_TIJUANA), delta, reportes, posiciones_por_codigo(df))
+        self._catalogo_publicado = self._version_catalogo
+        if self.almacen is not None: self.almacen.publicar(self.actual)
+
+    def solicitar(self, forzar=False):
+        # Pide un refresco inmediato sin bloquear a quien lo pide
+        self._forzar = self._forzar or forzar
+        self._despertar.set()
+
+    def esperar_primera_carga(self, timeout=None):
+        return self._primera_carga.wait(timeout)
+
+    def _bucle(self):
+        while True:
+            self._despertar.clear()
+            forzar, self._forzar = self._forzar, False
+            self.refrescar(forzar)
+            self._despertar.wait(self.intervalo)
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="refrescador-inventario", daemon=True)
+            self._hilo.start()
+        return self
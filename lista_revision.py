@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from inventario import como_float, distintos, posiciones_por_codigo, tabla_revision
+
+# --- LISTA DE REVISIÓN (CÓDIGOS + PIEZAS, UNIDA AL INVENTARIO VIGENTE) ---
+# En sesión solo se guarda, por renglón, el código, las piezas pedidas y la existencia /
+# corta caducidad que tenía al agregarse. Producto, sustancia y existencias se toman del
+# inventario actual con un solo join vectorizado al mostrar la lista: después de un refresco
+# nunca se ven datos viejos, y los renglones cuya existencia cambió desde que se agregaron
+# se marcan en la columna AVISO.
+
+COLUMNA_AVISO = 'AVISO'
+AVISO_YA_NO_VIENE = 'YA NO VIENE EN EL INVENTARIO'
+
+
+def _texto_numero(x):
+    if np.isnan(x): return '-'
+    return str(int(x)) if x % 1 == 0 else str(x)
+
+
+class ListaRevision:
+    def __init__(self):
+        self.codigos = []
+        self.solicitado = []   # piezas, o None si no se indicaron
+        self.existencia = []   # al agregar (float; nan = vacío)
+        self.corta_cad = []
+        self.version = 0
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def _cambio(self):
+        self.version += 1
+
+    def agregar(self, filas, solicitado=None):
+        # 'filas': renglones del inventario (CODIGO, EXISTENCIA, CORTA_CAD)
+        self.codigos.extend(filas['CODIGO'].astype(str).tolist())
+        self.solicitado.extend([solicitado] * len(filas))
+        self.existencia.extend(como_float(filas['EXISTENCIA']).tolist())
+        self.corta_cad.extend(como_float(filas['CORTA_CAD']).tolist())
+        self._cambio()
+
+    def borrar(self, posiciones):
+        borrar = set(posiciones)
+        for nombre in ('codigos', 'solicitado', 'existencia', 'corta_cad'):
+            setattr(self, nombre, [v for i, v in enumerate(getattr(self, nombre)) if i not in borrar])
+        self._cambio()
+
+    def vaciar(self):
+        for valores in (self.codigos, self.solicitado, self.existencia, self.corta_cad):
+            valores.clear()
+        self._cambio()
+
+    def _unir(self, df_inventario, posiciones=None):
+        # 'posiciones': CODIGO -> fila del inventario (Snapshot.posiciones); si no viene se arma aquí
+        if posiciones is None: posiciones = posiciones_por_codigo(df_inventario)
+        filas = posiciones.reindex(self.codigos).to_numpy(dtype='float64', na_value=np.nan)
+        encontrado = ~np.isnan(filas)
+        actual = df_inventario[['PRODUCTO', 'SUSTANCIA', 'EXISTENCIA', 'CORTA_CAD']].iloc[np.where(encontrado, filas, 0).astype(np.int64)]
+        actual = actual.reset_index(drop=True)
+        if not encontrado.all(): actual.loc[~encontrado, :] = None
+        return actual, encontrado
+
+    def tabla(self, df_inventario, descripciones=None, posiciones=None):
+        # (lista con COLUMNAS_REVISION, Series AVISO) contra el inventario vigente
+        actual, encontrado = self._unir(df_inventario, posiciones)
+        codigos = pd.Series(self.codigos, dtype=object)
+        producto = actual['PRODUCTO'].astype(object)
+        if descripciones is not None and not encontrado.all():
+            # Lo que ya no viene en el inventario se nombra con el catálogo
+            producto = producto.fillna(codigos.map(descripciones))
+        df_rev = pd.DataFrame({
+            'CODIGO': codigos,
+            'PRODUCTO': producto.fillna('-'),
+            'SUSTANCIA': actual['SUSTANCIA'].astype(object).fillna('-'),
+            'EXISTENCIA': actual['EXISTENCIA'],
+            'CORTA_CAD': actual['CORTA_CAD'],
+            'SOLICITADO': [str(s) if s else '-' for s in self.solicitado],
+        })
+
+        ex_antes, ex = np.array(self.existencia, dtype='float64'), como_float(actual['EXISTENCIA'])
+        cc_antes, cc = np.array(self.corta_cad, dtype='float64'), como_float(actual['CORTA_CAD'])
+        cambio_ex, cambio_cc = distintos(ex_antes, ex) & encontrado, distintos(cc_antes, cc) & encontrado
+        aviso = np.full(len(self), '', dtype=object)
+        for i in np.flatnonzero(cambio_ex | cambio_cc):
+            partes = []
+            if cambio_ex[i]: partes.append(f"EXISTENCIA ANTES: {_texto_numero(ex_antes[i])}")
+            if cambio_cc[i]: partes.append(f"CORTA CAD. ANTES: {_texto_numero(cc_antes[i])}")
+            aviso[i] = '⚠️ ' + ', '.join(partes)
+        aviso[~encontrado] = f"⚠️ {AVISO_YA_NO_VIENE}"
+        return tabla_revision(df_rev), pd.Series(aviso, name=COLUMNA_AVISO)
+
+    def marcar_vistos(self, df_inventario, posiciones=None):
+        # Toma la existencia actual como nueva referencia (quita los avisos de cambio)
+        actual, encontrado = self._unir(df_inventario, posiciones)
+        ex, cc = como_float(actual['EXISTENCIA']), como_float(actual['CORTA_CAD'])
+        self.existencia = np.where(encontrado, ex, self.existencia).tolist()
+        self.corta_cad = np.where(encontrado, cc, self.corta_cad).tolist()
+        self._cambio()
@@ -0,0 +1,47 @@
+import streamlit as st
+
+# --- RESULTADOS POR PÁGINAS Y SELECTORES CON BÚSQUEDA ---
+# Las listas grandes (clientes, catálogo, inventario) nunca se mandan completas al navegador:
+# se consulta el IndiceBusqueda y solo viaja la primera página de resultados ordenados;
+# "Cargar más" pide la siguiente. Cambiar la búsqueda regresa a la primera página.
+
+TAM_PAGINA = 50
+TAM_PAGINA_SELECTOR = 25
+
+
+def paginas_pedidas(clave, consulta):
+    estado = st.session_state.setdefault(f"_paginas_{clave}", {'consulta': None, 'paginas': 1})
+    if estado['consulta'] != consulta:
+        estado['consulta'] = consulta
+        estado['paginas'] = 1
+    return estado['paginas']
+
+
+def _siguiente_pagina(clave):
+    st.session_state[f"_paginas_{clave}"]['paginas'] += 1
+
+
+def boton_cargar_mas(clave, mostrados, total):
+    if mostrados < total:
+        st.button(f"⬇️ Cargar más ({mostrados} de {total})", key=f"mas_{clave}", on_click=_siguiente_pagina, args=(clave,))
+
+
+def selector_paginado(etiqueta, indice, opciones, key, placeholder="Buscar...", valor=None, on_change=None):
+    # Selectbox que solo recibe una página de 'opciones' (textos alineados con 'indice').
+    # 'valor' (o el valor actual del widget) se conserva aunque no esté en la página.
+    consulta = st.text_input(etiqueta, placeholder=placeholder, key=f"{key}_buscar").strip()
+    limite = paginas_pedidas(key, consulta) * TAM_PAGINA_SELECTOR
+    if consulta:
+        posiciones, total = indice.buscar(consulta, limite=limite)
+        lista = [opciones[i] for i in posiciones]
+    else:
+        total = len(opciones)
+        lista = list(opciones[:limite])
+
+    actual = st.session_state.get(key) or valor
+    if actual and actual not in lista: lista.insert(0, actual)
+
+    seleccion = st.selectbox(etiqueta, options=lista, index=lista.index(actual) if actual else None,
+                             placeholder="Selecciona...", key=key, on_change=on_change, label_visibility="collapsed")
+    boton_cargar_mas(key, min(limite, total), total)
+    return seleccion
@@ -0,0 +1,10 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# --- PROCESOS EN PARALELO (LECTURA DE INVENTARIOS, EXCEL POR CLIENTE, REPORTES POR LOTES) ---
+
+
+def pool_spawn(procesos):
+    # 'spawn': el servidor de Streamlit tiene hilos vivos y fork no es seguro ahí.
+    # Las funciones que se le pasan deben poder importarse desde el módulo (nada local).
+    return ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context('spawn'))
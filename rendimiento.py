@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- MEDICIÓN DE TIEMPOS POR ETAPA ---
+# 'with medir("etapa") as m:' cronometra un bloque; dentro se pueden anotar filas, bytes o
+# si el cache acertó (m['cache'] = 'hit'). Cada medición:
+#   - se guarda en un buffer circular compartido (lo lee el panel "Rendimiento" de la barra lateral)
+#   - se emite como una línea JSON en el logger 'rendimiento' (para agregarlas en producción)
+
+MAX_MEDICIONES = 500
+NOMBRE_LOG = 'rendimiento'
+
+Medicion = namedtuple('Medicion', ['momento', 'etapa', 'ms', 'datos', 'hilo'])
+
+_mediciones = deque(maxlen=MAX_MEDICIONES)
+_lock = threading.Lock()
+log = logging.getLogger(NOMBRE_LOG)
+
+
+def configurar_log(nivel=logging.INFO):
+    # Líneas JSON a stderr; RENDIMIENTO_LOG=0 las apaga (el panel sigue funcionando)
+    if log.handlers: return log
+    if os.environ.get('RENDIMIENTO_LOG', '1') == '0':
+        log.addHandler(logging.NullHandler())
+    else:
+        manejador = logging.StreamHandler()
+        manejador.setFormatter(logging.Formatter('%(message)s'))
+        log.addHandler(manejador)
+    log.setLevel(nivel)
+    log.propagate = False
+    return log
+
+
+@contextmanager
+def medir(etapa, **datos):
+    t0 = time.perf_counter()
+    try:
+        yield datos
+    except Exception as e:
+        datos['error'] = type(e).__name__
+        raise
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        registrar(etapa, ms, **datos)
+
+
+def registrar(etapa, ms, **datos):
+    medicion = Medicion(datetime.now(), etapa, ms, datos, threading.current_thread().name)
+    with _lock:
+        _mediciones.append(medicion)
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps({'ts': medicion.momento.isoformat(timespec='milliseconds'), 'etapa': etapa,
+                             'ms': round(ms, 2), 'hilo': medicion.hilo, **datos}, ensure_ascii=False, default=str))
+    return medicion
+
+
+def recientes(n=50):
+    with _lock:
+        return list(_mediciones)[-n:][::-1]
+
+
+def resumen():
+    # Por etapa: veces, última, mediana y máxima (ms), y aciertos de cache si aplica
+    with _lock:
+        mediciones = list(_mediciones)
+    por_etapa = {}
+    for m in mediciones:
+        por_etapa.setdefault(m.etapa, []).append(m)
+    filas = []
+    for etapa, ms in por_etapa.items():
+        tiempos = sorted(x.ms for x in ms)
+        caches = [x.datos['cache'] for x in ms if 'cache' in x.datos]
+        filas.append({
+            'ETAPA': etapa,
+            'VECES': len(ms),
+            'ÚLTIMA (ms)': round(ms[-1].ms, 1),
+            'MEDIANA (ms)': round(tiempos[len(tiempos) // 2], 1),
+            'MÁX (ms)': round(tiempos[-1], 1),
+            'CACHE HIT': f"{caches.count('hit')}/{len(caches)}" if caches else '',
+        })
+    return sorted(filas, key=lambda f: -f['MÁX (ms)'])
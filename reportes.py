@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from config import FILE_CLIENTES, FILE_PRODUCTOS, FILE_PLANTILLA, FILE_IMAGEN
+from exportar_excel import agrupar_por_cliente, generar_faltantes, nombre_archivo_cliente, nombre_seguro
+from catalogos import cargar_catalogos
+from indices_catalogo import IndicesCatalogo
+from captura_masiva import fecha_de_texto, leer_archivo, resolver
+from inventario import cargar_procesado, clasificar_existencias, tabla_revision, puntaje_novedad
+from sincronizacion import ArchivoRemoto, EXTENSIONES_INVENTARIO, sha1_archivo
+
+# --- GENERADOR POR LOTES (SIN NAVEGADOR) ---
+# Misma lógica que la app (catálogos, inventario, Faltantes.xlsx e imagen de revisión) para
+# correr desde la línea de comandos, p. ej. en un proceso nocturno:
+#
+#   python reportes.py --inventarios ./inventarios --pedidos pedidos.jsonl --salida ./reportes -j 4
+#
+# Pedidos: JSON Lines o CSV/xlsx. Cada renglón es un producto (cliente, codigo, cantidad[, fecha])
+# o, en JSON Lines, un pedido completo {"cliente": ..., "fecha": ..., "items": [{"codigo", "cantidad"}]}.
+# Por cada cliente se escribe Faltantes_<cliente>.xlsx y Revision_<cliente>.png (varias páginas
+# -> _1.png, _2.png, ...), comparando lo pedido contra el inventario más reciente de la carpeta.
+
+# Catálogos, plantilla, logo y salida por defecto junto a este archivo: el comando funciona
+# desde cualquier carpeta
+DIRECTORIO_BASE = Path(__file__).resolve().parent
+
+
+def inventario_reciente(carpeta, df_productos, sustancias=None, cache=None):
+    # El archivo más nuevo de la carpeta (misma regla que el refresco de Drive)
+    archivos = []
+    for nombre in os.listdir(carpeta):
+        ruta = os.path.join(carpeta, nombre)
+        if os.path.isfile(ruta) and nombre.lower().endswith(EXTENSIONES_INVENTARIO):
+            stat = os.stat(ruta)
+            archivos.append(ArchivoRemoto(ruta, nombre, stat.st_size, stat.st_mtime))
+    if not archivos: raise FileNotFoundError(f"No hay inventarios (.xlsx/.csv) en {carpeta}")
+
+    reciente = max(archivos, key=puntaje_novedad)
+    df, _, _ = cargar_procesado(reciente.id, reciente.nombre, sha1_archivo(reciente.id), df_productos, cache, sustancias)
+    return reciente.nombre, df
+
+
+def leer_pedidos(ruta):
+    # Renglones CLIENTE / CODIGO / CANTIDAD / FECHA como texto
+    if ruta.lower().endswith(('.jsonl', '.json', '.ndjson')):
+        filas = []
+        with open(ruta, encoding='utf-8') as f:
+            for linea in f:
+                if not linea.strip(): continue
+                obj = {str(k).lower(): v for k, v in json.loads(linea).items()}
+                cliente = obj.get('cliente', obj.get('cli_cod'))
+                items = obj.get('items') or [obj]
+                for it in items:
+                    it = {str(k).lower(): v for k, v in it.items()}
+                    filas.append({'CODIGO': it.get('codigo'), 'CANTIDAD': it.get('cantidad', it.get('solicitada')),
+                                  'CLIENTE': cliente, 'FECHA': obj.get('fecha')})
+        return pd.DataFrame(filas, columns=['CODIGO', 'CANTIDAD', 'CLIENTE', 'FECHA'], dtype=object)
+
+    with open(ruta, 'rb') as f:
+        lineas = leer_archivo(f.read(), ruta)
+    if 'FECHA' not in lineas: lineas['FECHA'] = None
+    return lineas
+
+
+def armar_pedidos(lineas, indices, fecha_defecto=None):
+    # Un pedido por (cliente, fecha). Devuelve los pedidos y un reporte de lo que no se usó.
+    fecha_defecto = fecha_defecto or date.today()
+    lineas = lineas.copy()
+    lineas['FECHA'] = [fecha_de_texto(f, fecha_defecto) for f in lineas['FECHA']]
+
+    pedidos = []
+    reporte = {'desconocidos': [], 'clientes_desconocidos': [], 'invalidos': [], 'sin_cliente': 0}
+    for fecha, grupo in lineas.groupby('FECHA', sort=False):
+        r = resolver(grupo[['CODIGO', 'CANTIDAD', 'CLIENTE']], indices)
+        reporte['desconocidos'] += r.desconocidos
+        reporte['clientes_desconocidos'] += r.clientes_desconocidos
+        reporte['invalidos'] += r.invalidos
+        reporte['sin_cliente'] += int(r.renglones['CLIENTE'].isna().sum())
+        for display, items in r.renglones[r.renglones['CLIENTE'].notna()].groupby('CLIENTE', sort=False):
+            cod, nom = display.split(" - ", 1)
+            pedidos.append({'cli_cod': cod, 'cli_nom': nom, 'fecha': fecha, 'items': items.drop(columns='CLIENTE').reset_index(drop=True)})
+    for llave in ('desconocidos', 'clientes_desconocidos'):
+        reporte[llave] = list(dict.fromkeys(reporte[llave]))
+    return pedidos, reporte
+
+
+def revision_cliente(pedidos, df_inventario):
+    # Lista de revisión de un cliente: lo pedido (sumado por código) contra el inventario
+    items = pd.concat([p['items'] for p in pedidos], ignore_index=True)
+    solicitado = items.groupby('CODIGO', sort=False).agg(PRODUCTO=('DESCRIPCION', 'first'), SOLICITADO=('SOLICITADA', 'sum'))
+    inv = df_inventario.drop_duplicates('CODIGO').set_index('CODIGO')
+    rev = inv.reindex(solicitado.index)[['PRODUCTO', 'SUSTANCIA', 'EXISTENCIA', 'CORTA_CAD']]
+    rev['PRODUCTO'] = rev['PRODUCTO'].fillna(solicitado['PRODUCTO'])
+    rev['SOLICITADO'] = solicitado['SOLICITADO']
+    return tabla_revision(rev.rename_axis('CODIGO').reset_index())
+
+
+def generar_cliente(args):
+    # Trabajo de un cliente (corre en un proceso del pool): escribe sus archivos y devuelve las rutas
+    cod, pedidos, df_rev, salida, plantilla, logo, imagenes = args
+    rutas = []
+    ruta = os.path.join(salida, nombre_archivo_cliente(cod))
+    with open(ruta, 'wb') as f:
+        f.write(generar_faltantes(pedidos, plantilla, logo))
+    rutas.append(ruta)
+
+    if imagenes and df_rev is not None:
+        from imagen_revision import renderizar_revision
+        paginas = renderizar_revision(df_rev, clasificar_existencias(df_rev), f"{pedidos[0]['cli_nom']}\n{cod}")
+        for n, png in enumerate(paginas, start=1):
+            sufijo = f"_{n}" if len(paginas) > 1 else ""
+            ruta = os.path.join(salida, f"Revision_{nombre_seguro(cod)}{sufijo}.png")
+            with open(ruta, 'wb') as f:
+                f.write(png)
+            rutas.append(ruta)
+    return rutas
+
+
+def generar_lote(pedidos, salida, df_inventario=None, trabajadores=1, plantilla=str(DIRECTORIO_BASE / FILE_PLANTILLA),
+                 logo=str(DIRECTORIO_BASE / FILE_IMAGEN), imagenes=True):
+    # Agrupa por cliente y reparte los clientes entre 'trabajadores' procesos
+    os.makedirs(salida, exist_ok=True)
+    tareas = [(cod, grupo, revision_cliente(grupo, df_inventario) if df_inventario is not None else None,
+               salida, plantilla, logo, imagenes) for cod, grupo in agrupar_por_cliente(pedidos).items()]
+
+    if trabajadores <= 1 or len(tareas) < 2:
+        return [r for t in tareas for r in generar_cliente(t)]
+
+    from paralelo import pool_spawn
+    with pool_spawn(trabajadores) as pool:
+        return [r for rutas in pool.map(generar_cliente, tareas, chunksize=max(1, len(tareas) // (trabajadores * 4))) for r in rutas]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera reportes de Faltantes e imágenes de revisión por lotes.")
+    parser.add_argument('--pedidos', required=True, help="Archivo de pedidos (.jsonl, .csv o .xlsx)")
+    parser.add_argument('--inventarios', help="Carpeta con los inventarios diarios (se usa el más reciente)")
+    parser.add_argument('--salida', default=str(DIRECTORIO_BASE / 'reportes'), help="Carpeta de salida (default: reportes/ junto a este archivo)")
+    parser.add_argument('-j', '--trabajadores', type=int, default=os.cpu_count() or 1, help="Procesos en paralelo")
+    parser.add_argument('--fecha', help="Fecha para renglones sin fecha (AAAA-MM-DD; default: hoy)")
+    parser.add_argument('--clientes', default=str(DIRECTORIO_BASE / FILE_CLIENTES))
+    parser.add_argument('--productos', default=str(DIRECTORIO_BASE / FILE_PRODUCTOS))
+    parser.add_argument('--sin-imagenes', action='store_true', help="Solo los Excel")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    df_clientes, df_productos, errores = cargar_catalogos(args.clientes, args.productos)
+    for e in errores: print(f"⚠️ {e}", file=sys.stderr)
+    indices = IndicesCatalogo(df_clientes, df_productos)
+
+    df_inventario = None
+    if args.inventarios and not args.sin_imagenes:
+        from cache_columnar import CacheColumnar, DIRECTORIO_CACHE
+        cache = CacheColumnar(str(DIRECTORIO_BASE / DIRECTORIO_CACHE))
+        nombre, df_inventario = inventario_reciente(args.inventarios, df_productos, indices.sustancias, cache)
+        print(f"Inventario: {nombre} ({len(df_inventario)} productos)")
+
+    fecha = date.fromisoformat(args.fecha) if args.fecha else None
+    pedidos, reporte = armar_pedidos(leer_pedidos(args.pedidos), indices, fecha)
+    if reporte['desconocidos']: print(f"⚠️ Códigos no encontrados: {', '.join(map(str, reporte['desconocidos']))}", file=sys.stderr)
+    if reporte['clientes_desconocidos']: print(f"⚠️ Clientes no encontrados: {', '.join(map(str, reporte['clientes_desconocidos']))}", file=sys.stderr)
+    if reporte['invalidos']: print(f"⚠️ Cantidad inválida: {', '.join(map(str, reporte['invalidos']))}", file=sys.stderr)
+    if reporte['sin_cliente']: print(f"⚠️ {reporte['sin_cliente']} renglones sin cliente (omitidos)", file=sys.stderr)
+    if not pedidos:
+        print("No hay pedidos válidos.", file=sys.stderr)
+        return 1
+
+    rutas = generar_lote(pedidos, args.salida, df_inventario, args.trabajadores, imagenes=not args.sin_imagenes)
+    print(f"{len(pedidos)} pedidos -> {len(rutas)} archivos en {args.salida} ({time.perf_counter() - t0:.1f} s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
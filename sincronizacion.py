@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+from rendimiento import medir
+
+# --- SINCRONIZACIÓN INCREMENTAL DE LA CARPETA DE INVENTARIOS ---
+# En lugar de borrar la carpeta y bajar todo cada vez, se guarda un manifiesto
+# (id -> nombre, tamaño, mtime, hash) y solo se descargan archivos nuevos o cambiados.
+# La fuente remota es intercambiable: FuenteDrive en producción, FuenteLocal para pruebas.
+
+NOMBRE_MANIFIESTO = '.manifiesto.json'
+EXTENSIONES_INVENTARIO = ('.xlsx', '.csv')
+
+# tamano/mtime pueden ser None si la fuente no los reporta (Drive público no lo hace)
+ArchivoRemoto = namedtuple('ArchivoRemoto', ['id', 'nombre', 'tamano', 'mtime'])
+ArchivoLocal = namedtuple('ArchivoLocal', ['id', 'nombre', 'ruta', 'tamano', 'mtime', 'sha1'])
+ResultadoSync = namedtuple('ResultadoSync', ['archivos', 'descargados', 'eliminados'])
+
+
+class FuenteArchivos(ABC):
+    # False si listar() no trae tamaño ni fecha: un archivo reemplazado con el mismo id no se
+    # nota en el manifiesto y hay que volver a bajarlo para comparar el hash (ver sincronizar)
+    reporta_cambios = True
+
+    @abstractmethod
+    def listar(self):
+        # [ArchivoRemoto] de la carpeta
+        ...
+
+    @abstractmethod
+    def descargar(self, archivo, ruta_destino):
+        ...
+
+
+class FuenteDrive(FuenteArchivos):
+    reporta_cambios = False
+
+    def __init__(self, folder_id):
+        self.folder_id = folder_id
+
+    def listar(self):
+        import gdown
+        url = f'https://drive.google.com/drive/folders/{self.folder_id}'
+        # skip_download=True: solo consulta el contenido de la carpeta
+        archivos = gdown.download_folder(url, quiet=True, use_cookies=False, skip_download=True)
+        return [ArchivoRemoto(a.id, os.path.basename(a.path), None, None) for a in archivos or []]
+
+    def descargar(self, archivo, ruta_destino):
+        import gdown
+        gdown.download(id=archivo.id, output=ruta_destino, quiet=True, use_cookies=False)
+
+
+class FuenteLocal(FuenteArchivos):
+    # Carpeta local que hace las veces de Drive (pruebas o servidores con la carpeta montada)
+    def __init__(self, directorio):
+        self.directorio = directorio
+
+    def listar(self):
+        archivos = []
+        for nombre in sorted(os.listdir(self.directorio)):
+            ruta = os.path.join(self.directorio, nombre)
+            if not os.path.isfile(ruta): continue
+            stat = os.stat(ruta)
+            archivos.append(ArchivoRemoto(nombre, nombre, stat.st_size, stat.st_mtime))
+        return archivos
+
+    def descargar(self, archivo, ruta_destino):
+        shutil.copy2(os.path.join(self.directorio, archivo.id), ruta_destino)
+
+
+def sha1_archivo(ruta):
+    h = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def leer_manifiesto(directorio):
+    try:
+        with open(os.path.join(directorio, NOMBRE_MANIFIESTO), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_manifiesto(directorio, manifiesto):
+    ruta = os.path.join(directorio, NOMBRE_MANIFIESTO)
+    tmp = ruta + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, ruta)
+
+
+def _cambio(remoto, entrada, directorio):
+    if entrada is None: return True
+    if not os.path.exists(os.path.join(directorio, entrada['archivo'])): return True
+    if remoto.tamano is not None and remoto.tamano != entrada.get('tamano_remoto'): return True
+    if remoto.mtime is not None and remoto.mtime != entrada.get('mtime_remoto'): return True
+    return False
+
+
+def sincronizar(fuente, directorio, extensiones=EXTENSIONES_INVENTARIO, forzar=()):
+    # 'forzar': ids que se vuelven a bajar aunque el manifiesto diga que no cambiaron. Con una
+    # fuente que no reporta tamaño/fecha (Drive) es la única forma de detectar un archivo
+    # reemplazado con el mismo id: se baja y se compara su hash con el del manifiesto.
+    os.makedirs(directorio, exist_ok=True)
+    manifiesto = leer_manifiesto(directorio)
+
+    with medir('listar_remoto', fuente=type(fuente).__name__) as m:
+        remotos = [a for a in fuente.listar() if a.nombre.lower().endswith(extensiones)]
+        m['archivos'] = len(remotos)
+    descargados = []
+
+    for remoto in remotos:
+        entrada = manifiesto.get(remoto.id)
+        if not (remoto.id in forzar or _cambio(remoto, entrada, directorio)): continue
+
+        # El id evita choques entre archivos homónimos de la carpeta
+        archivo = entrada['archivo'] if entrada else f"{remoto.id}_{remoto.nombre}"
+        ruta = os.path.join(directorio, archivo)
+        tmp = ruta + '.part'
+        with medir('descargar', archivo=remoto.nombre) as m:
+            fuente.descargar(remoto, tmp)
+            m['bytes'] = os.path.getsize(tmp)
+            sha1 = sha1_archivo(tmp)
+            # 'hit': el contenido bajado es igual al que ya se tenía
+            m['cache'] = 'hit' if entrada and entrada.get('sha1') == sha1 else 'miss'
+
+        if entrada and entrada.get('sha1') == sha1 and os.path.exists(ruta):
+            # Mismo contenido: se conserva el archivo (y su mtime) existente
+            os.remove(tmp)
+        else:
+            os.replace(tmp, ruta)
+            descargados.append(remoto.id)
+
+        stat = os.stat(ruta)
+        manifiesto[remoto.id] = {
+            'nombre': remoto.nombre,
+            'archivo': archivo,
+            'tamano': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha1': sha1,
+            'tamano_remoto': remoto.tamano,
+            'mtime_remoto': remoto.mtime,
+        }
+
+    # Archivos que ya no están en la carpeta remota
+    vigentes = {a.id for a in remotos}
+    eliminados = [i for i in manifiesto if i not in vigentes]
+    for i in eliminados:
+        try: os.remove(os.path.join(directorio, manifiesto[i]['archivo']))
+        except OSError: pass
+        del manifiesto[i]
+
+    _guardar_manifiesto(directorio, manifiesto)
+
+    archivos = [
+        ArchivoLocal(i, e['nombre'], os.path.join(directorio, e['archivo']), e['tamano'], e['mtime'], e['sha1'])
+        for i, e in manifiesto.items()
+    ]
+    return ResultadoSync(archivos, descargados, eliminados)
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pandas as pd
+
+from almacen_pedidos import AlmacenPedidos
+
+
+def _pedido(cod, fecha, renglones):
+    items = pd.DataFrame(renglones, columns=['CODIGO', 'DESCRIPCION', 'SOLICITADA', 'SURTIDO', 'O.C.'])
+    return {'cli_cod': cod, 'cli_nom': f'FARMACIA {cod}', 'fecha': fecha, 'items': items}
+
+
+def test_guardar_y_leer_lote(tmp_path):
+    almacen = AlmacenPedidos(str(tmp_path / 'pedidos.sqlite'))
+    uno = almacen.guardar(_pedido('20272', date(2026, 10, 1), [['S07010', 'JABON', 3, 0, 'N/A'], ['V01018', 'PARACETAMOL', 2, 1, None]]), 'lote-a')
+    dos = almacen.guardar(_pedido('20309', date(2026, 10, 2), [['V02025', 'IBUPROFENO', 1.5, 0, 'N/A']]), 'lote-a')
+    tres = almacen.guardar(_pedido('20272', date(2026, 10, 3), []), 'lote-b')
+
+    pedidos = almacen.pedidos_de_lote('lote-a')
+    assert [p['id'] for p in pedidos] == [uno, dos]
+    assert pedidos[0]['fecha'] == date(2026, 10, 1)
+    assert pedidos[0]['items']['CODIGO'].tolist() == ['S07010', 'V01018']
+    assert pedidos[0]['items']['SOLICITADA'].tolist() == [3, 2]
+    assert pd.isna(pedidos[0]['items']['O.C.'].iloc[1])
+    assert pedidos[1]['items']['SOLICITADA'].tolist() == [1.5]
+    assert [len(p['items']) for p in almacen.pedidos_de_lote('lote-b')] == [0]
+    assert almacen.ids_de_lote('lote-b') == [tres]
+    almacen.cerrar()
+
+    # Sobrevive a un reinicio
+    almacen = AlmacenPedidos(str(tmp_path / 'pedidos.sqlite'))
+    assert almacen.ids_de_lote('lote-a') == [uno, dos]
+    almacen.cerrar()
+
+
+def test_anular_y_buscar(tmp_path):
+    almacen = AlmacenPedidos(str(tmp_path / 'pedidos.sqlite'))
+    uno = almacen.guardar(_pedido('20272', date(2026, 10, 1), [['S07010', 'JABON', 3, 0, 'N/A']]), 'lote')
+    dos = almacen.guardar(_pedido('20272', date(2026, 10, 5), [['V01018', 'PARACETAMOL', 2, 0, 'N/A']]), 'lote')
+
+    assert almacen.buscar(cli_cod='20272')['ID'].tolist() == [dos, uno]
+    assert almacen.buscar(codigo='S07010')['ID'].tolist() == [uno]
+    assert almacen.buscar(desde=date(2026, 10, 2))['PIEZAS'].tolist() == [2]
+
+    almacen.anular(dos)
+    assert almacen.ids_de_lote('lote') == [uno]
+    assert almacen.buscar(cli_cod='20272')['ID'].tolist() == [uno]
+    almacen.cerrar()
@@ -0,0 +1,54 @@
+import numpy as np
+
+from buscador import IndiceBusqueda
+
+CODIGOS = [f'S{i:05d}' for i in range(200)]
+TEXTOS = [f'{c} | PRODUCTO {i} TABLETAS {i % 7}MG | SUSTANCIA {i % 13}' for i, c in enumerate(CODIGOS)]
+
+
+def _resultado(indice, consulta):
+    r = indice.buscar(consulta)
+    return list(r.posiciones), r.total
+
+
+def _igual_a_reconstruir(derivado, textos, codigos):
+    completo = IndiceBusqueda(textos, codigos)
+    assert derivado.textos == completo.textos
+    assert derivado._palabras == completo._palabras
+    assert derivado.codigos == completo.codigos
+    assert derivado.postings.keys() == completo.postings.keys()
+    for g, filas in completo.postings.items():
+        assert np.array_equal(derivado.postings[g], filas), g
+    for consulta in ('PRODUCTO 1', 'TABLETAS 3MG', 'S00150', 'SUSTANCIA 12', 'NUEVO'):
+        assert _resultado(derivado, consulta) == _resultado(completo, consulta)
+
+
+def test_derivar_igual_a_reconstruir():
+    previo = IndiceBusqueda(TEXTOS, CODIGOS)
+    # Se quitan filas, se cambia el texto de otras y se agregan nuevas en medio y al final
+    codigos, textos = list(CODIGOS), list(TEXTOS)
+    del codigos[10:15], textos[10:15]
+    textos[20] = f'{codigos[20]} | PRODUCTO NUEVO | SUSTANCIA 1'
+    codigos.insert(50, 'V99999'); textos.insert(50, 'V99999 | NUEVO EN MEDIO | SUSTANCIA 2')
+    codigos.append('V99998'); textos.append('V99998 | NUEVO AL FINAL | SUSTANCIA 3')
+
+    derivado, reutilizadas = previo.derivar(textos, codigos)
+    assert reutilizadas == len(codigos) - 3
+    _igual_a_reconstruir(derivado, textos, codigos)
+
+
+def test_derivar_con_filas_reordenadas():
+    previo = IndiceBusqueda(TEXTOS, CODIGOS)
+    codigos, textos = CODIGOS[50:] + CODIGOS[:50], TEXTOS[50:] + TEXTOS[:50]
+    derivado, reutilizadas = previo.derivar(textos, codigos)
+    # Las filas que quedaron fuera de orden se reindexan
+    assert reutilizadas == 150
+    _igual_a_reconstruir(derivado, textos, codigos)
+
+
+def test_derivar_no_modifica_el_original():
+    previo = IndiceBusqueda(TEXTOS, CODIGOS)
+    antes = _resultado(previo, 'PRODUCTO 1')
+    previo.derivar(TEXTOS[:50], CODIGOS[:50])
+    assert _resultado(previo, 'PRODUCTO 1') == antes
+    assert len(previo) == len(TEXTOS)
@@ -0,0 +1,75 @@
+import os
+import time
+
+import rendimiento
+from catalogos import VigilanteCatalogos
+
+CLIENTES = "CLIENTE CLAVE,CLIENTE\n20272,FARMACIA MAYOF\n20309,FARMACIA SANTA MARIA\n"
+PRODUCTOS = "CLAVE,NOMBRE,SUSTANCIA ACTIVA\nS07010,JABON MOTA,COCO\nS07011,JABON MOTA 12,COCO\nV01018,PARACETAMOL 500,PARACETAMOL\n"
+
+
+def _escribir(ruta, texto):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    # Fuera de la ventana de ESPERA_ESCRITURA
+    antes = time.time() - 60
+    os.utime(ruta, (antes, antes))
+
+
+def _vigilante(tmp_path):
+    clientes, productos = tmp_path / 'clientes.csv', tmp_path / 'productos.csv'
+    _escribir(clientes, CLIENTES)
+    _escribir(productos, PRODUCTOS)
+    vigilante = VigilanteCatalogos(str(clientes), str(productos), intervalo=3600)
+    avisos = []
+    vigilante.suscribir(avisos.append)
+    return vigilante, productos, avisos
+
+
+def test_recarga_publica_version_nueva(tmp_path):
+    vigilante, productos, avisos = _vigilante(tmp_path)
+    _escribir(productos, PRODUCTOS + "V02025,IBUPROFENO 400,IBUPROFENO\n")
+    assert vigilante.revisar()
+    assert len(vigilante.actual.df_productos) == 4
+    assert len(vigilante.actual.indices.buscador_productos.buscar('IBUPROFENO').posiciones) == 1
+    assert avisos == [vigilante.actual]
+
+
+def test_archivo_malo_conserva_version_anterior(tmp_path):
+    vigilante, productos, avisos = _vigilante(tmp_path)
+    previo = vigilante.actual
+    _escribir(productos, "NOMBRE,SUSTANCIA\nJABON,COCO\n")
+
+    assert not vigilante.revisar()
+    assert vigilante.actual is previo
+    assert len(vigilante.actual.df_productos) == 3
+    assert 'CODIGO' in vigilante.ultimo_error
+    assert avisos == []
+
+    # Se reintenta en la siguiente vuelta aunque el archivo no vuelva a cambiar
+    assert not vigilante.revisar()
+    _escribir(productos, PRODUCTOS + "V02025,IBUPROFENO 400,IBUPROFENO\n")
+    assert vigilante.revisar()
+    assert len(vigilante.actual.df_productos) == 4
+    assert vigilante.ultimo_error is None
+    assert len(avisos) == 1
+
+
+def test_archivo_vacio_conserva_version_anterior(tmp_path):
+    vigilante, productos, avisos = _vigilante(tmp_path)
+    _escribir(productos, "CLAVE,NOMBRE,SUSTANCIA ACTIVA\n")
+    assert not vigilante.revisar()
+    assert len(vigilante.actual.df_productos) == 3
+    assert vigilante.ultimo_error
+    assert avisos == []
+
+
+def test_mismo_contenido_cuenta_como_hit(tmp_path):
+    vigilante, productos, avisos = _vigilante(tmp_path)
+    # Copiado encima con el mismo contenido: cambia la firma, no el hash
+    _escribir(productos, PRODUCTOS)
+    os.utime(productos, (time.time() - 30, time.time() - 30))
+    assert not vigilante.revisar()
+    medicion = next(m for m in rendimiento.recientes() if m.etapa == 'cargar_catalogos')
+    assert medicion.datos['cache'] == 'hit'
+    assert avisos == []
@@ -0,0 +1,54 @@
+import os
+import zipfile
+from datetime import date
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+
+from exportar_excel import FILA_INICIO_ITEMS, MIN_CLIENTES_PARALELO, generar_faltantes, generar_zip_por_cliente, nombre_archivo_cliente
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLANTILLA = os.path.join(RAIZ, 'plantilla.xlsx')
+LOGO = os.path.join(RAIZ, 'logo.png')
+
+
+def _pedido(cod, n):
+    items = pd.DataFrame({'CODIGO': [f'S0{i:04d}' for i in range(n)], 'DESCRIPCION': [f'PRODUCTO {i}' for i in range(n)],
+                          'SOLICITADA': list(range(1, n + 1)), 'SURTIDO': [0] * n, 'O.C.': ['N/A'] * n})
+    return {'cli_cod': cod, 'cli_nom': f'FARMACIA {cod}', 'fecha': date(2026, 10, 1), 'items': items}
+
+
+def _partes(xlsx):
+    # Contenido de cada parte del .xlsx, sin la fecha de creación (docProps/core.xml)
+    with zipfile.ZipFile(BytesIO(xlsx)) as zf:
+        return {n: zf.read(n) for n in zf.namelist() if n != 'docProps/core.xml'}
+
+
+def _libros(zip_bytes):
+    with zipfile.ZipFile(BytesIO(zip_bytes)) as zf:
+        return {n: _partes(zf.read(n)) for n in zf.namelist()}
+
+
+def test_libro_con_los_datos_del_pedido():
+    pedidos = [_pedido('20272', 3), _pedido('20272', 1)]
+    wb = openpyxl.load_workbook(BytesIO(generar_faltantes(pedidos, PLANTILLA, LOGO, 'TIJUANA', 'AGENTE')))
+    assert wb.sheetnames == ['20272', '20272-2']
+    ws = wb['20272']
+    assert ws['B2'].value == 'TIJUANA' and ws['B3'].value == 'AGENTE' and ws['B4'].value == 'FARMACIA 20272'
+    assert ws['B6'].value == 20272 and ws['D6'].value == '01/10/2026'
+    filas = [[c.value for c in fila] for fila in ws.iter_rows(min_row=FILA_INICIO_ITEMS + 1, max_row=FILA_INICIO_ITEMS + 3, max_col=5)]
+    assert filas == pedidos[0]['items'].values.tolist()
+
+
+def test_zip_en_paralelo_igual_a_un_libro_por_cliente():
+    clientes = [str(20270 + i) for i in range(MIN_CLIENTES_PARALELO + 1)]
+    pedidos = [_pedido(cod, 2 + i) for i, cod in enumerate(clientes)] + [_pedido(clientes[0], 1)]
+    esperado = {nombre_archivo_cliente(cod): _partes(generar_faltantes([p for p in pedidos if p['cli_cod'] == cod], PLANTILLA, LOGO))
+                for cod in clientes}
+
+    en_serie = _libros(generar_zip_por_cliente(pedidos, PLANTILLA, LOGO, procesos=1))
+    en_paralelo = _libros(generar_zip_por_cliente(pedidos, PLANTILLA, LOGO, procesos=2))
+    assert list(en_serie) == list(esperado)
+    assert en_serie == esperado
+    assert en_paralelo == esperado
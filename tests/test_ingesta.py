@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from cache_columnar import CacheColumnar
+from captura_masiva import leer_archivo, leer_texto, resolver
+from catalogos import cargar_productos
+from ingesta import LIMITE_CODIFICACION, MOTIVO_CODIGO_ESPACIOS, MOTIVO_NO_NUMERICO, MOTIVO_SIN_CODIGO
+from inventario import cargar_procesado, leer_inventario
+
+# Título arriba del encabezado, latin-1, un subtotal sin código, un código con espacio y una existencia que no es número
+INVENTARIO_MALO = ("INVENTARIO SUCURSAL TIJUANA\n"
+                   "CÓDIGO,DESCRIPCIÓN,CORTA CAD,EXISTENCIA\n"
+                   "S07010,JABON MOTA,0,10\n"
+                   ",SUBTOTAL,,5\n"
+                   "V01 018,PARACETAMOL 500,1,3\n"
+                   "V02025,IBUPROFENO 400,0,SIN DATO\n").encode('latin-1')
+
+
+def test_reporte_de_archivo_mal_formado():
+    lectura = leer_inventario(INVENTARIO_MALO, 'inventario.csv')
+    reporte = lectura.reporte
+    assert reporte.codificacion == 'latin-1'
+    assert reporte.fila_encabezado == 2
+    assert reporte.columnas['CODIGO'] == 'CODIGO'
+    assert reporte.filas == 4
+    problemas = reporte.problemas[['FILA', 'COLUMNA', 'MOTIVO']].values.tolist()
+    assert problemas == [[4, 'CODIGO', MOTIVO_SIN_CODIGO],
+                         [5, 'CODIGO', MOTIVO_CODIGO_ESPACIOS],
+                         [6, 'EXISTENCIA', MOTIVO_NO_NUMERICO]]
+
+
+def test_acento_despues_del_limite_de_codificacion():
+    renglon = b"S07010,JABON MOTA,0,10\n"
+    contenido = (b"CLAVE,DESCRIPCION,CORTA CAD,EXISTENCIA\n" + renglon * (LIMITE_CODIFICACION // len(renglon) + 1)
+                 + "V01018,CAFÉ,0,1\n".encode('latin-1'))
+    lectura = leer_inventario(contenido, 'inventario.csv')
+    assert lectura.reporte.codificacion == 'latin-1'
+    assert lectura.df['PRODUCTO'].iloc[-1] == 'CAFÉ'
+
+
+def test_cache_devuelve_el_reporte(tmp_path):
+    productos = tmp_path / 'productos.csv'
+    productos.write_text("CLAVE,NOMBRE,SUSTANCIA\nS07010,JABON MOTA,COCO\n", encoding='utf-8')
+    df_productos, _ = cargar_productos(str(productos))
+    cache = CacheColumnar(str(tmp_path / 'cache'))
+
+    _, _, reporte = cargar_procesado(INVENTARIO_MALO, 'inventario.csv', 'abc', df_productos, cache)
+    df, _, en_cache = cargar_procesado(INVENTARIO_MALO, 'inventario.csv', 'abc', df_productos, cache)
+    assert en_cache is not None
+    assert len(en_cache.problemas) == len(reporte.problemas) == 3
+    assert len(df) > 0
+
+
+def test_lista_sin_encabezados():
+    df = leer_archivo(b"S07010,3\nV01018,2,20272\n", 'lista.csv')
+    assert df['CODIGO'].tolist() == ['S07010', 'V01018']
+    assert df['CANTIDAD'].tolist() == ['3', '2']
+    assert 'FECHA' not in df
+
+
+def test_lista_con_encabezados_y_fecha():
+    df = leer_archivo(b"CLAVE;PIEZAS;CLIENTE;FECHA\nS07010;3;20272;01/10/2026\n;;;\n", 'lista.csv')
+    assert df[['CODIGO', 'CANTIDAD', 'CLIENTE', 'FECHA']].values.tolist() == [['S07010', '3', '20272', '01/10/2026']]
+    assert pd.isna(leer_archivo(b"S07010 3\n", 'lista.csv')['CLIENTE']).all()
+
+
+def test_resolver_codigos_y_cantidades():
+    indices = SimpleNamespace(descripciones=pd.Series({'S07010': 'JABON', 'abc1': 'MINUSCULAS'}),
+                              cliente_por_codigo=pd.Series({'20272': '20272 - FARMACIA'}))
+    r = resolver(leer_texto("s07010 2\nabc1 1\nS07010 0.4\nS07010 1.0\nXX 1\n"), indices)
+    assert r.renglones[['CODIGO', 'SOLICITADA']].values.tolist() == [['S07010', 3], ['abc1', 1]]
+    assert r.invalidos == ['S07010']
+    assert r.desconocidos == ['XX']
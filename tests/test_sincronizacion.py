@@ -0,0 +1,112 @@
+import os
+
+import pandas as pd
+import pytest
+
+from inventario import RefrescadorInventario
+from sincronizacion import ArchivoRemoto, FuenteArchivos, FuenteLocal, _cambio, leer_manifiesto, sincronizar
+
+
+def _escribir(ruta, texto, mtime=None):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    if mtime is not None: os.utime(ruta, (mtime, mtime))
+
+
+class FuenteSinFechas(FuenteLocal):
+    # Como Drive: lista ids y nombres, sin tamaño ni fecha
+    reporta_cambios = False
+
+    def listar(self):
+        return [a._replace(tamano=None, mtime=None) for a in super().listar()]
+
+
+def test_fuente_archivos_es_abstracta():
+    with pytest.raises(TypeError):
+        FuenteArchivos()
+
+
+def test_cambio():
+    assert _cambio(ArchivoRemoto('a', 'a.csv', 10, 1.0), None, '.')
+
+
+def test_cambio_por_tamano_fecha_y_archivo_local(tmp_path):
+    (tmp_path / 'a.csv').write_text('x')
+    entrada = {'archivo': 'a.csv', 'tamano_remoto': 10, 'mtime_remoto': 1.0}
+    assert not _cambio(ArchivoRemoto('a', 'a.csv', 10, 1.0), entrada, str(tmp_path))
+    assert _cambio(ArchivoRemoto('a', 'a.csv', 11, 1.0), entrada, str(tmp_path))
+    assert _cambio(ArchivoRemoto('a', 'a.csv', 10, 2.0), entrada, str(tmp_path))
+    # Sin tamaño ni fecha (Drive) no hay nada que comparar
+    assert not _cambio(ArchivoRemoto('a', 'a.csv', None, None), entrada, str(tmp_path))
+    os.remove(tmp_path / 'a.csv')
+    assert _cambio(ArchivoRemoto('a', 'a.csv', 10, 1.0), entrada, str(tmp_path))
+
+
+def test_sincronizar_incremental(tmp_path):
+    remoto, local = tmp_path / 'remoto', tmp_path / 'local'
+    remoto.mkdir()
+    _escribir(remoto / 'inv1.csv', 'a', mtime=1000)
+    _escribir(remoto / 'inv2.xlsx', 'b', mtime=1000)
+    _escribir(remoto / 'notas.txt', 'ignorado')
+    fuente = FuenteLocal(str(remoto))
+
+    primero = sincronizar(fuente, str(local))
+    assert sorted(primero.descargados) == ['inv1.csv', 'inv2.xlsx']
+    assert sorted(a.nombre for a in primero.archivos) == ['inv1.csv', 'inv2.xlsx']
+
+    # Sin cambios: no se baja nada
+    assert sincronizar(fuente, str(local)).descargados == []
+
+    # Un archivo cambia, otro desaparece
+    _escribir(remoto / 'inv1.csv', 'a2', mtime=2000)
+    os.remove(remoto / 'inv2.xlsx')
+    r = sincronizar(fuente, str(local))
+    assert r.descargados == ['inv1.csv']
+    assert r.eliminados == ['inv2.xlsx']
+    assert list(leer_manifiesto(str(local))) == ['inv1.csv']
+    (archivo,) = r.archivos
+    with open(archivo.ruta) as f:
+        assert f.read() == 'a2'
+
+
+def test_sincronizar_forzado_compara_hash(tmp_path):
+    remoto, local = tmp_path / 'remoto', tmp_path / 'local'
+    remoto.mkdir()
+    _escribir(remoto / 'inv.csv', 'a')
+    fuente = FuenteSinFechas(str(remoto))
+    sincronizar(fuente, str(local))
+
+    # Mismo contenido: se baja pero no cuenta como descargado
+    assert sincronizar(fuente, str(local), forzar={'inv.csv'}).descargados == []
+    _escribir(remoto / 'inv.csv', 'b')
+    assert sincronizar(fuente, str(local)).descargados == []
+    assert sincronizar(fuente, str(local), forzar={'inv.csv'}).descargados == ['inv.csv']
+
+
+def test_refresco_detecta_archivo_reemplazado_con_el_mismo_id(tmp_path):
+    remoto = tmp_path / 'remoto'
+    remoto.mkdir()
+    encabezado = 'INVENTARIO\nCLAVE,DESCRIPCION,LAB,UNIDAD,COSTO,CORTA CAD.,EXISTENCIA\n'
+    _escribir(remoto / 'inv.csv', encabezado + 'S1,JABON,L,PZA,1,0,5\n')
+    productos = pd.DataFrame({'CODIGO': ['S1'], 'SUSTANCIA': ['COCO']})
+    refrescador = RefrescadorInventario(FuenteSinFechas(str(remoto)), str(tmp_path / 'local'), productos)
+
+    assert refrescador.refrescar().df['EXISTENCIA'].tolist() == [5]
+    _escribir(remoto / 'inv.csv', encabezado + 'S1,JABON,L,PZA,1,0,7\n')
+    # Una vuelta normal no vuelve a bajar el archivo en uso; "Recargar Nube" sí
+    assert refrescador.refrescar().df['EXISTENCIA'].tolist() == [5]
+    assert refrescador.refrescar(forzar=True).df['EXISTENCIA'].tolist() == [7]
+    assert refrescador.ultimo_error is None
+
+
+def test_refresco_revisa_el_hash_cada_intervalo_revision(tmp_path):
+    remoto = tmp_path / 'remoto'
+    remoto.mkdir()
+    encabezado = 'INVENTARIO\nCLAVE,DESCRIPCION,LAB,UNIDAD,COSTO,CORTA CAD.,EXISTENCIA\n'
+    _escribir(remoto / 'inv.csv', encabezado + 'S1,JABON,L,PZA,1,0,5\n')
+    productos = pd.DataFrame({'CODIGO': ['S1'], 'SUSTANCIA': ['COCO']})
+    refrescador = RefrescadorInventario(FuenteSinFechas(str(remoto)), str(tmp_path / 'local'), productos, intervalo_revision=0)
+
+    assert refrescador.refrescar().df['EXISTENCIA'].tolist() == [5]
+    _escribir(remoto / 'inv.csv', encabezado + 'S1,JABON,L,PZA,1,0,7\n')
+    assert refrescador.refrescar().df['EXISTENCIA'].tolist() == [7]
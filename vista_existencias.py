@@ -0,0 +1,320 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from rendimiento import medir
+from paginacion import TAM_PAGINA, paginas_pedidas, boton_cargar_mas, selector_paginado
+from inventario import snapshot_local, clasificar_existencias, COLORES_PANTALLA, TIPOS_CAMBIO, CAMBIO_RESURTIDO, CAMBIO_AGOTADO
+
+# ==============================================================================
+# VISTA 1: REVISAR EXISTENCIAS (INVENTARIO DIARIO)
+# ==============================================================================
+
+MAX_CAMBIOS_MOSTRADOS = 500
+
+
+def panel_cambios(delta):
+    # Lo que cambió contra el inventario anterior (calculado una vez al refrescar, no por sesión)
+    total = len(delta.nuevos) + len(delta.eliminados) + len(delta.cambios)
+    with st.expander(f"🔁 Cambios desde el último inventario ({total})"):
+        st.caption(f"Contra: {delta.anterior}")
+        conteo = delta.cambios['CAMBIO'].value_counts()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Resurtidos", int(conteo.get(CAMBIO_RESURTIDO, 0)))
+        c2.metric("Agotados", int(conteo.get(CAMBIO_AGOTADO, 0)))
+        c3.metric("Códigos nuevos", len(delta.nuevos))
+        c4.metric("Ya no vienen", len(delta.eliminados))
+
+        opciones = TIPOS_CAMBIO + ["CÓDIGOS NUEVOS", "YA NO VIENEN"]
+        tipos = st.multiselect("Mostrar:", opciones, default=[CAMBIO_RESURTIDO], key="filtro_cambios")
+        partes = []
+        if "CÓDIGOS NUEVOS" in tipos: partes.append(delta.nuevos.assign(CAMBIO="CÓDIGO NUEVO"))
+        if "YA NO VIENEN" in tipos: partes.append(delta.eliminados.assign(CAMBIO="YA NO VIENE"))
+        elegidos = [t for t in tipos if t in TIPOS_CAMBIO]
+        if elegidos: partes.append(delta.cambios[delta.cambios['CAMBIO'].isin(elegidos)])
+        if not partes: return
+
+        tabla = pd.concat([p.astype({'CAMBIO': str}) for p in partes], ignore_index=True)[list(delta.cambios.columns)]
+        if len(tabla) > MAX_CAMBIOS_MOSTRADOS:
+            st.caption(f"Mostrando {MAX_CAMBIOS_MOSTRADOS} de {len(tabla)} (usa el buscador para ver el resto)")
+            tabla = tabla.iloc[:MAX_CAMBIOS_MOSTRADOS]
+        st.dataframe(tabla, width="stretch", hide_index=True)
+
+
+def panel_validacion(reportes):
+    # Renglones que el archivo trae mal (sin código, existencia que no es número): se revisan una
+    # vez al leer el archivo, no por sesión
+    con_problemas = [r for r in reportes if len(r.problemas)]
+    if not con_problemas: return
+    total = sum(len(r.problemas) for r in con_problemas)
+    with st.expander(f"⚠️ Renglones con datos inválidos ({total})"):
+        for r in con_problemas:
+            columnas = ", ".join(f"{d} = {c}" for d, c in r.columnas.items())
+            st.caption(f"{r.archivo} | encabezado en la fila {r.fila_encabezado} | {columnas}"
+                       + (f" | {r.codificacion}" if r.codificacion else ""))
+            tabla = r.problemas
+            if len(tabla) > MAX_CAMBIOS_MOSTRADOS:
+                st.caption(f"Mostrando {MAX_CAMBIOS_MOSTRADOS} de {len(tabla)}")
+                tabla = tabla.iloc[:MAX_CAMBIOS_MOSTRADOS]
+            st.dataframe(tabla.astype({'VALOR': str}), width="stretch", hide_index=True)
+
+
+def mostrar(df_clientes, df_productos, indices, almacen, cache_columnar, refrescador):
+    st.header("🔍 Buscador de Existencias")
+
+    # --- LÓGICA DE CARGA ---
+    uploaded_file = st.file_uploader("📤 Cargar archivo local (sobrescribe)", type=['csv', 'xlsx'])
+    
+    df_activo = None
+    indice_activo = None
+    delta_activo = None
+    reportes_activos = ()
+    posiciones_activas = None
+    info_origen = ""
+
+    # CASO A: Local
+    if uploaded_file:
+        try:
+            contenido = uploaded_file.getvalue()
+            version = almacen.version_de(contenido)
+            # Si alguien ya subió este mismo archivo se reutiliza su versión (sin volver a parsear)
+            snapshot = almacen.obtener(version)
+            if snapshot is None:
+                snapshot = almacen.publicar(snapshot_local(contenido, uploaded_file.name, df_productos, cache_columnar, indices.sustancias))
+
+            # En sesión solo guardamos el id de versión
+            st.session_state.version_inventario = snapshot.sha1
+            df_activo, indice_activo, reportes_activos, posiciones_activas = snapshot.df, snapshot.indice, snapshot.reportes, snapshot.posiciones
+            info_origen = f"Local: {snapshot.nombre}"
+            
+        except Exception as e:
+            st.error(f"Error archivo local: {e}")
+
+    # CASO B: Memoria (archivo local ya cargado en esta sesión)
+    elif st.session_state.version_inventario is not None:
+        snapshot = almacen.obtener(st.session_state.version_inventario)
+        if snapshot is not None:
+            df_activo, indice_activo, reportes_activos, posiciones_activas = snapshot.df, snapshot.indice, snapshot.reportes, snapshot.posiciones
+            info_origen = f"Local: {snapshot.nombre}"
+        else:
+            # La versión salió del almacén (muchas versiones nuevas): volvemos a la nube
+            st.session_state.version_inventario = None
+            st.rerun()
+
+    # CASO C: Carpeta Drive (Automático, refrescada en segundo plano)
+    elif refrescador:
+        if refrescador.actual is None:
+            # Solo el primer arranque del servidor espera la descarga inicial
+            with st.spinner("☁️ Sincronizando con Drive (esto toma unos segundos)..."):
+                refrescador.esperar_primera_carga(timeout=120)
+            # Rerun para que la barra lateral también muestre el inventario
+            if refrescador.actual is not None: st.rerun()
+
+        snapshot = refrescador.actual
+        if snapshot is not None:
+            df_activo, indice_activo, delta_activo, reportes_activos = snapshot.df, snapshot.indice, snapshot.delta, snapshot.reportes
+            posiciones_activas = snapshot.posiciones
+            info_origen = f"☁️ Nube: {snapshot.nombre} | 📅 Fecha: {snapshot.fecha_mod}"
+        elif refrescador.ultimo_error and "Error" in refrescador.ultimo_error:
+            st.error(refrescador.ultimo_error)
+        else:
+            st.warning("⚠️ Carpeta vacía o sin acceso.")
+
+    # --- RENDERIZADO ---
+    if df_activo is not None:
+        # Mostrar barra de info con versión
+        st.success(f"✅ {info_origen}")
+        if delta_activo is not None: panel_cambios(delta_activo)
+        panel_validacion(reportes_activos)
+        
+        col_search, col_reset = st.columns([4, 1])
+        with col_reset:
+            # Botón Recargar: Olvida el archivo local y pide una sincronización inmediata
+            if st.button("🔄 Recargar Nube"):
+                st.session_state.version_inventario = None
+                if refrescador:
+                    # Revisa también si el archivo actual fue reemplazado; no bloquea la sesión
+                    refrescador.solicitar(forzar=True)
+                    st.toast("☁️ Sincronizando en segundo plano...")
+                st.rerun()
+        
+        # --- BUSCADOR PERSISTENTE ---
+        def actualizar_busqueda_inv():
+            st.session_state.memoria_busqueda_inv = st.session_state.input_busqueda_inv
+
+        # El input muestra el valor guardado en memoria
+        texto_input = st.text_input(
+            "¿Qué buscas?", 
+            value=st.session_state.memoria_busqueda_inv, # Recupera lo escrito antes
+            placeholder="Nombre, Clave o Sustancia...",
+            key="input_busqueda_inv", 
+            on_change=actualizar_busqueda_inv # Guarda al escribir
+        )
+        
+        # Convertimos a mayúsculas para la lógica de filtrado
+        busqueda = texto_input.upper().strip()
+        
+        resultados = pd.DataFrame()
+        
+        if busqueda:
+            # Búsqueda literal por palabras sobre el índice invertido (sin escaneo regex),
+            # ordenada por relevancia: código exacto > inicio de palabra > subcadena
+            # Solo viajan al navegador las primeras páginas ("Cargar más" pide la siguiente)
+            limite = paginas_pedidas("inventario", busqueda) * TAM_PAGINA
+            with medir('buscar_inventario', filas=len(df_activo)) as m:
+                posiciones, total = indice_activo.buscar(busqueda, limite=limite)
+                resultados = df_activo.iloc[posiciones].drop(columns=['INDICE_BUSQUEDA'])
+                m.update(encontrados=total, mostrados=len(posiciones))
+            if total > len(posiciones):
+                st.success(f"Encontrados: {total} (mostrando los {len(posiciones)} más relevantes)")
+            else:
+                st.success(f"Encontrados: {total}")
+            
+            dynamic_key = f"search_table_{st.session_state.reset_counter}"
+            
+            event = st.dataframe(
+                resultados,
+                width="stretch",
+                hide_index=True,
+                on_select="rerun", 
+                selection_mode="multi-row",
+                key=dynamic_key 
+            )
+            boton_cargar_mas("inventario", len(posiciones), total)
+            
+            if len(event.selection.rows) > 0:
+                st.divider()
+                # --- NUEVO: COLUMNAS PARA BOTÓN Y CANTIDAD ---
+                c_btn, c_qty = st.columns([3, 1])
+                
+                # Input de cantidad (opcional, por defecto 0)
+                qty_add = c_qty.number_input("Piezas (Opcional):", min_value=0, value=0, key="qty_add_rev")
+                
+                if c_btn.button(f"⬇️ Agregar Selección ({len(event.selection.rows)})"):
+                    # Solo se guardan códigos y piezas (si es 0 se muestra "-"); el resto se toma
+                    # del inventario vigente cada vez que se muestra la lista
+                    st.session_state.lista_revision.agregar(resultados.iloc[event.selection.rows], qty_add if qty_add > 0 else None)
+                    
+                    st.session_state.reset_counter += 1 
+                    st.toast("✅ Agregado")
+                    st.rerun() 
+        else:
+            st.info("Inventario cargado. Escribe arriba para filtrar.")
+
+        # --- SECCIÓN INFERIOR: TABLA DE REVISIÓN ACUMULADA ---
+        st.divider()
+        st.subheader("📋 Tu Lista de Revisión")
+        
+        # Columnas para los botones de acción
+        col_info, col_borrar_sel, col_borrar_todo = st.columns([3, 2, 1])
+        
+        lista = st.session_state.lista_revision
+        if len(lista):
+            # Unida al inventario actual; columnas en el orden del generador por lotes
+            with medir('unir_revision', filas=len(lista)):
+                df_rev, aviso = lista.tabla(df_activo, indices.descripciones, posiciones_activas)
+
+            # Estado de cada fila (vectorizado, una vez): lo usan la tabla y la imagen
+            estado_rev = clasificar_existencias(df_rev)
+
+            # Estilos: una matriz de CSS para toda la tabla en lugar de una llamada por fila
+            def estilo_existencias(df):
+                fondo = estado_rev.map(COLORES_PANTALLA).astype(str).to_numpy()
+                return pd.DataFrame(np.repeat(fondo[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+            # En pantalla (no en la imagen) se avisa qué existencias cambiaron desde que se agregaron
+            df_pantalla = df_rev
+            con_aviso = int((aviso != '').sum())
+            if con_aviso:
+                df_pantalla = df_rev.assign(**{aviso.name: aviso.to_numpy()})
+                with col_info:
+                    st.caption(f"⚠️ {con_aviso} producto(s) cambiaron desde que los agregaste")
+                    if st.button("✔️ Marcar como vistos"):
+                        lista.marcar_vistos(df_activo, posiciones_activas)
+                        st.rerun()
+
+            # --- TABLA INTERACTIVA (CON SELECCIÓN) ---
+            # Guardamos el evento para saber qué filas seleccionaste
+            with medir('tabla_revision', filas=len(df_rev)):
+                event_revision = st.dataframe(
+                    df_pantalla.style.apply(estilo_existencias, axis=None),
+                    width="stretch",
+                    hide_index=True,
+                    on_select="rerun",          # <--- Activamos selección
+                    selection_mode="multi-row", # <--- Selección múltiple
+                    key="tabla_revision_final"
+                )
+            
+            # --- LÓGICA DE BORRADO SELECTIVO ---
+            filas_seleccionadas = event_revision.selection.rows
+            
+            with col_borrar_sel:
+                # El botón solo aparece si seleccionaste algo
+                if filas_seleccionadas:
+                    if st.button(f"🗑️ Borrar ({len(filas_seleccionadas)}) seleccionados"):
+                        lista.borrar(filas_seleccionadas)
+                        st.rerun()
+
+            with col_borrar_todo:
+                if st.button("🔥 Borrar Todo"):
+                    lista.vaciar()
+                    st.rerun()
+
+            # --- CONFIGURACIÓN DE IMAGEN ---
+            st.divider()
+            st.caption("Configuración de la Imagen:")
+            
+            c_cli, c_opt = st.columns([2, 1])
+            with c_cli:
+                cliente_foto = selector_paginado("Título de Cliente (Opcional):", indices.buscador_clientes, indices.clientes, key="cli_foto_input", placeholder="Sin título... (buscar cliente)")
+            with c_opt:
+                incluir_sustancia = st.checkbox("Incluir columna 'Sustancia'", value=True)
+
+            if st.button("📸 Descargar Tabla como Imagen"):
+                try:
+                    # 1. FILTRAR DATOS
+                    df_plot = df_rev.copy()
+                    
+                    if not incluir_sustancia:
+                        if 'SUSTANCIA' in df_plot.columns:
+                            df_plot = df_plot.drop(columns=['SUSTANCIA'])
+                            
+                    # 2. TÍTULO
+                    titulo = None
+                    if cliente_foto:
+                        cod, nom = cliente_foto.split(" - ", 1)
+                        titulo = f"{nom}\n{cod}"
+
+                    # 3. DIBUJAR (Pillow, mismos colores que la tabla en pantalla; listas largas = varias páginas)
+                    from imagen_revision import renderizar_revision  # Pillow solo al pedir la imagen
+                    with medir('imagen_revision', filas=len(df_plot)) as m:
+                        paginas = renderizar_revision(df_plot, estado_rev, titulo)
+                        m.update(paginas=len(paginas), bytes=sum(len(p) for p in paginas))
+
+                    if len(paginas) == 1:
+                        st.download_button(
+                            label="⬇️ Guardar PNG",
+                            data=paginas[0],
+                            file_name="Lista_Revision.png",
+                            mime="image/png"
+                        )
+                    else:
+                        # Varias páginas: se entregan juntas en un ZIP
+                        import zipfile
+                        buf = BytesIO()
+                        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_STORED) as zf:
+                            for n, png in enumerate(paginas, start=1):
+                                zf.writestr(f"Lista_Revision_{n}.png", png)
+                        st.download_button(
+                            label=f"⬇️ Guardar PNG ({len(paginas)} páginas, ZIP)",
+                            data=buf.getvalue(),
+                            file_name="Lista_Revision.zip",
+                            mime="application/zip"
+                        )
+                except Exception as e:
+                    st.error(f"Error generando imagen: {e}")
+
+        else:
+            st.caption("Selecciona productos arriba para armar tu lista de revisión.")
@@ -0,0 +1,274 @@
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from rendimiento import medir
+from paginacion import TAM_PAGINA, paginas_pedidas, boton_cargar_mas, selector_paginado
+
+# Lote de captura: va en la URL (?lote=...) para que recargar el navegador no pierda los pedidos
+def lote_actual():
+    lote = st.query_params.get('lote')
+    if not lote:
+        lote = uuid.uuid4().hex[:12]
+        st.query_params['lote'] = lote
+    return lote
+
+# ==============================================================================
+# VISTA 2: REPORTAR FALTANTES (POS)
+# ==============================================================================
+
+def mostrar(df_clientes, df_productos, indices, almacen_pedidos):
+    st.header("📝 Generador de Reporte de Faltantes")
+    lote = lote_actual()
+    
+    # --- BOTÓN DE REINICIO EN LA BARRA LATERAL ---
+    with st.sidebar:
+        st.divider()
+        st.markdown("### ⚙️ Acciones")
+        # Usamos type="primary" para que salga rojo/destacado
+        if st.button("🗑️ BORRAR TODO (Reiniciar)", type="primary"):
+            # Los pedidos siguen en el historial; solo se empieza un lote nuevo
+            st.query_params['lote'] = uuid.uuid4().hex[:12]
+            st.session_state.carrito.vaciar()
+            st.session_state.cliente_box = None
+            st.session_state.memoria_cliente = None # <--- NUEVO: Limpiar memoria
+            st.rerun()
+    # ----------------------------------------------------
+    
+    tab1, tab2 = st.tabs(["1. Registrar", "2. Descargar Excel"])
+    
+    with tab1:
+        col1, col2 = st.columns([1, 2])
+        
+        # --- COLUMNA IZQUIERDA: BÚSQUEDA Y SELECCIÓN ---
+        with col1:
+            st.subheader("Datos")
+            
+            # --- LÓGICA DE PERSISTENCIA PARA CLIENTE ---
+            # 1. Recuperamos el cliente guardado (si sigue existiendo en el catálogo)
+            memoria = st.session_state.memoria_cliente
+            cliente_guardado = memoria if memoria in indices.posicion_cliente else None
+
+            # 2. Función para actualizar la memoria cuando cambies el cliente
+            def actualizar_cliente():
+                st.session_state.memoria_cliente = st.session_state.cliente_box
+
+            # 3. Selector con búsqueda: solo viaja al navegador una página de clientes
+            selector_paginado(
+                "Cliente:",
+                indices.buscador_clientes,
+                indices.clientes,
+                key="cliente_box",
+                placeholder="Buscar cliente por clave o nombre...",
+                valor=cliente_guardado,
+                on_change=actualizar_cliente # Guardamos cambios al momento
+            )
+            
+            # --- LÓGICA DE PERSISTENCIA PARA FECHA ---
+            def actualizar_fecha():
+                st.session_state.memoria_fecha = st.session_state.fecha_box
+
+            fecha_input = st.date_input(
+                "Fecha:", 
+                value=st.session_state.memoria_fecha, # Usamos valor recuperado
+                key="fecha_box", # Cambié el key para diferenciarlo
+                on_change=actualizar_fecha
+            )
+            
+            st.divider()
+            st.subheader("Producto")
+            
+            # 1. Input de Búsqueda (Texto)
+            query_faltantes = st.text_input("Buscar:", placeholder="Nombre, Clave o Sustancia...", key="search_faltantes_input").upper()
+            
+            # Inicializar contador para resetear la tabla de búsqueda
+            if 'reset_search_faltantes' not in st.session_state:
+                st.session_state.reset_search_faltantes = 0
+            
+            if query_faltantes:
+                # 2. Filtrar Resultados (mismo motor de búsqueda que el inventario, ya ordenado)
+                # Solo las primeras páginas de resultados ("Cargar más" pide la siguiente)
+                limite_f = paginas_pedidas("productos_faltantes", query_faltantes) * TAM_PAGINA
+                with medir('buscar_catalogo', filas=len(df_productos)) as m:
+                    posiciones_f, total_f = indices.buscador_productos.buscar(query_faltantes, limite=limite_f)
+                    m['encontrados'] = total_f
+                resultados_f = df_productos.iloc[posiciones_f].copy()
+                
+                # --- LÓGICA DE LIMPIEZA "VISTA 1" ---
+                
+                # A. Eliminar vacíos en Descripción
+                resultados_f = resultados_f.dropna(subset=['DESCRIPCION'])
+                
+                # B. ELIMINAR DUPLICADOS POR CÓDIGO (La clave para que se vea limpio)
+                # Esto fuerza a que solo exista 1 fila por cada código único.
+                resultados_f = resultados_f.drop_duplicates(subset=['CODIGO'], keep='first')
+                
+                # C. Seleccionar solo las columnas bonitas (Ocultamos el índice de búsqueda)
+                # Aseguramos el orden: CÓDIGO | DESCRIPCION | SUSTANCIA
+                cols_mostrar = ['CODIGO', 'DESCRIPCION', 'SUSTANCIA']
+                # Filtramos solo las columnas que realmente existen para evitar errores
+                cols_existentes = [c for c in cols_mostrar if c in resultados_f.columns]
+                resultados_f = resultados_f[cols_existentes]
+                
+                # -------------------------------------
+                
+               # 3. Mostrar Tabla para Seleccionar
+                key_table = f"table_results_{st.session_state.reset_search_faltantes}"
+                
+                event_f = st.dataframe(
+                    resultados_f, 
+                    width="stretch",
+                    hide_index=True,
+                    on_select="rerun",
+                    selection_mode="single-row", 
+                    key=key_table
+                    # HE BORRADO LA LÍNEA: height=200 
+                    # Al borrarla, la tabla se encoge automáticamente al tamaño del contenido.
+                )
+                boton_cargar_mas("productos_faltantes", len(posiciones_f), total_f)
+                
+                # 4. Si hay selección, mostramos controles de agregar
+                if len(event_f.selection.rows) > 0:
+                    idx = event_f.selection.rows[0]
+                    row_selected = resultados_f.iloc[idx]
+                    
+                    st.success(f"Seleccionado: **{row_selected['DESCRIPCION']}**")
+                    
+                    c_qty, c_btn = st.columns([1, 1])
+                    cantidad = c_qty.number_input("Cantidad:", min_value=1, value=1, key="qty_faltantes_input")
+                    
+                    def agregar_seleccion():
+                        if st.session_state.cliente_box:
+                            item = {
+                                "CODIGO": row_selected['CODIGO'],
+                                "DESCRIPCION": row_selected['DESCRIPCION'],
+                                "SOLICITADA": cantidad,
+                                "SURTIDO": 0,
+                                "O.C.": "N/A"
+                            }
+                            st.session_state.carrito.agregar(item)
+                            
+                            st.session_state.reset_search_faltantes += 1 
+                            st.session_state.search_faltantes_input = "" 
+                            st.session_state.qty_faltantes_input = 1     
+                        else:
+                            st.warning("⚠️ ¡Falta seleccionar el Cliente arriba!")
+
+                    c_btn.button("➕ Agregar", on_click=agregar_seleccion, use_container_width=True)
+
+            # --- CAPTURA MASIVA: toda una lista en un solo rerun ---
+            with st.expander("📋 Captura masiva (pegar lista o subir archivo)"):
+                texto_masivo = st.text_area("Un renglón por producto: código, cantidad[, cliente]", key="masiva_texto", height=150,
+                                            placeholder="S07010 3\nV01018, 2\nV02025, 1, 20272")
+                archivo_masivo = st.file_uploader("...o sube un CSV / Excel", type=['csv', 'xlsx'], key="masiva_archivo")
+
+                if st.button("📥 Cargar lista", use_container_width=True):
+                    from captura_masiva import fecha_de_texto, leer_texto, leer_archivo, resolver
+                    partes = []
+                    if texto_masivo.strip(): partes.append(leer_texto(texto_masivo))
+                    if archivo_masivo is not None:
+                        try: partes.append(leer_archivo(archivo_masivo.getvalue(), archivo_masivo.name))
+                        except Exception as e: st.error(f"Error leyendo archivo: {e}")
+
+                    if partes:
+                        lineas = pd.concat(partes, ignore_index=True)
+                        # Un archivo con columna FECHA guarda cada pedido con su fecha; sin ella, la de arriba
+                        if 'FECHA' in lineas: lineas['FECHA'] = [fecha_de_texto(f, fecha_input) for f in lineas['FECHA']]
+                        r = resolver(lineas, indices)
+                        sin_cliente = r.renglones[r.renglones['CLIENTE'].isna()]
+                        con_cliente = r.renglones[r.renglones['CLIENTE'].notna()]
+
+                        # Renglones sin cliente -> carrito actual
+                        if len(sin_cliente):
+                            if st.session_state.cliente_box:
+                                st.session_state.carrito.agregar_varios(sin_cliente)
+                                st.success(f"🛒 {len(sin_cliente)} productos agregados al carrito")
+                            else:
+                                st.warning(f"⚠️ {len(sin_cliente)} renglones sin cliente: selecciona el Cliente arriba")
+
+                        # Renglones con cliente -> un pedido por cliente (y fecha) directo a "Pedidos Listos"
+                        if 'FECHA' not in con_cliente: con_cliente = con_cliente.assign(FECHA=fecha_input)
+                        guardados = 0
+                        for (display, fecha), grupo in con_cliente.groupby(['CLIENTE', 'FECHA'], sort=False):
+                            cod_cli, nom_cli = display.split(" - ", 1)
+                            almacen_pedidos.guardar({"cli_cod": cod_cli, "cli_nom": nom_cli, "fecha": fecha,
+                                                     "items": grupo.drop(columns='FECHA')}, lote)
+                            guardados += 1
+                        if len(con_cliente):
+                            st.success(f"💾 {guardados} pedidos guardados ({len(con_cliente)} renglones)")
+
+                        if r.desconocidos: st.error(f"Códigos no encontrados en el catálogo: {', '.join(r.desconocidos)}")
+                        if r.clientes_desconocidos: st.error(f"Clientes no encontrados: {', '.join(r.clientes_desconocidos)}")
+                        if r.invalidos: st.warning(f"Cantidad inválida en: {', '.join(r.invalidos)}")
+
+        # --- COLUMNA DERECHA: CARRITO (Igual que antes) ---
+        with col2:
+            st.subheader("🛒 Carrito")
+            carrito = st.session_state.carrito
+            if len(carrito):
+                # La tabla base solo cambia con la versión del carrito; las ediciones llegan como
+                # deltas en el on_change y la llave nueva reinicia el editor sobre la tabla ya aplicada
+                key_editor = f"editor_data_{carrito.version}"
+                def aplicar_edicion():
+                    carrito.aplicar_cambios(st.session_state.get(key_editor))
+
+                st.data_editor(carrito.vista(), width="stretch", num_rows="dynamic", key=key_editor, on_change=aplicar_edicion,
+                    column_config={"SOLICITADA": st.column_config.NumberColumn("Solicitada", width="small"),
+                                   "SURTIDO": st.column_config.NumberColumn("Surtido", width="small"),
+                                   "O.C.": st.column_config.TextColumn("O.C.", width="small")})
+                
+                # Callback para guardar pedido completo
+                def finalizar_pedido_cb():
+                    if st.session_state.cliente_box:
+                        cod_cli, nom_cli = st.session_state.cliente_box.split(" - ", 1)
+                        pedido_nuevo = {
+                            "cli_cod": cod_cli,
+                            "cli_nom": nom_cli,
+                            "fecha": fecha_input,
+                            "items": carrito.registros()
+                        }
+                        almacen_pedidos.guardar(pedido_nuevo, lote)
+                        carrito.vaciar()
+                        st.session_state.cliente_box = None
+                        st.session_state.search_faltantes_input = "" # Limpieza extra por si acaso
+                    else:
+                        st.error("Falta Cliente")
+
+                st.button("💾 TERMINAR PEDIDO", type="primary", use_container_width=True, on_click=finalizar_pedido_cb)
+            else:
+                st.info("El carrito está vacío.")
+
+    with tab2:
+        # Los pedidos guardados no cambian: el almacén los tiene en cache y aquí solo se arma
+        # un renglón de resumen por pedido; el detalle se muestra solo del seleccionado
+        pedidos = almacen_pedidos.pedidos_de_lote(lote)
+        st.metric("Pedidos Listos", len(pedidos))
+        if pedidos:
+            resumen = pd.DataFrame([{"#": i + 1, "CLIENTE": p['cli_cod'], "NOMBRE": p['cli_nom'], "FECHA": p['fecha'].strftime('%d/%m/%Y'),
+                                     "RENGLONES": len(p['items'])} for i, p in enumerate(pedidos)])
+            event_p = st.dataframe(resumen, width="stretch", hide_index=True, on_select="rerun", selection_mode="single-row", key="tabla_pedidos")
+            if event_p.selection.rows and event_p.selection.rows[0] < len(pedidos):
+                p = pedidos[event_p.selection.rows[0]]
+                st.dataframe(p['items'], hide_index=True)
+                if st.button("Borrar", key=f"del_{p['id']}"):
+                    almacen_pedidos.anular(p['id']); st.rerun()
+        
+        modo_export = st.radio("Formato:", ["Un solo Excel (una hoja por pedido)", "Un Excel por cliente (ZIP)"], horizontal=True, key="modo_export")
+
+        if st.button("🚀 GENERAR EXCEL", disabled=(len(pedidos)==0)):
+            try:
+                # Plantilla y logo se leen una vez y quedan en cache (ver exportar_excel.py)
+                if modo_export.startswith("Un Excel por cliente"):
+                    from exportar_excel import generar_zip_por_cliente
+                    with st.spinner("Generando un libro por cliente..."), medir('exportar_zip', pedidos=len(pedidos)) as m:
+                        b = generar_zip_por_cliente(pedidos)
+                        m['bytes'] = len(b)
+                    st.download_button("⬇️ DESCARGAR", data=b, file_name="Faltantes_por_cliente.zip", mime="application/zip")
+                else:
+                    from exportar_excel import generar_faltantes
+                    with medir('exportar_excel', pedidos=len(pedidos)) as m:
+                        b = generar_faltantes(pedidos)
+                        m['bytes'] = len(b)
+                    st.download_button("⬇️ DESCARGAR", data=b, file_name="Faltantes.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            except Exception as e: st.error(f"Error: {e}")
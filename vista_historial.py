@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+import streamlit as st
+
+from paginacion import selector_paginado
+
+# ==============================================================================
+# VISTA 3: HISTORIAL DE PEDIDOS (consultas al AlmacenPedidos)
+# ==============================================================================
+
+def mostrar(indices, almacen_pedidos):
+    st.header("📚 Historial de Pedidos")
+
+    # --- FILTROS (cada uno usa un índice de la base) ---
+    c1, c2, c3 = st.columns([2, 1, 1])
+    with c1: cliente = selector_paginado("Cliente:", indices.buscador_clientes, indices.clientes, key="hist_cliente", placeholder="Todos (buscar cliente)")
+    rango = c2.date_input("Fechas:", value=(date.today() - timedelta(days=30), date.today()), key="hist_fechas")
+    codigo = c3.text_input("Código de producto:", key="hist_codigo").strip().upper()
+
+    desde, hasta = (rango[0], rango[-1]) if isinstance(rango, (tuple, list)) and rango else (None, None)
+    cli_cod = cliente.split(" - ", 1)[0] if cliente else None
+
+    resumen = almacen_pedidos.buscar(cli_cod=cli_cod, desde=desde, hasta=hasta, codigo=codigo or None)
+    if resumen.empty:
+        st.info("No hay pedidos con esos filtros.")
+        return
+
+    st.caption(f"{len(resumen)} pedidos (selecciona para ver el detalle o exportar)")
+    evento = st.dataframe(resumen, width="stretch", hide_index=True, on_select="rerun", selection_mode="multi-row", key="hist_tabla")
+
+    seleccion = [int(resumen['ID'].iloc[i]) for i in evento.selection.rows]
+    if not seleccion: return
+
+    pedidos = almacen_pedidos.cargar(seleccion)
+    for p in pedidos:
+        with st.expander(f"#{p['id']} · {p['fecha'].strftime('%d/%m/%Y')} · {p['cli_nom']}"):
+            st.dataframe(p['items'], hide_index=True)
+
+    if st.button("🚀 GENERAR EXCEL", key="hist_excel"):
+        try:
+            from exportar_excel import generar_faltantes
+            b = generar_faltantes(pedidos)
+            st.download_button("⬇️ DESCARGAR", data=b, file_name="Faltantes.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        except Exception as e: st.error(f"Error: {e}")